@@ -0,0 +1,30 @@
+"""Add thumbnail and normalized board image paths
+
+Revision ID: b3f1c2d4e5a6
+Revises: 7943ee89d669
+Create Date: 2026-10-19 10:12:41.208113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, Sequence[str], None] = '7943ee89d669'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('positions', sa.Column('thumbnail_path', sa.String(length=255), nullable=True))
+    op.add_column('positions', sa.Column('board_image_path', sa.String(length=255), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('positions', 'board_image_path')
+    op.drop_column('positions', 'thumbnail_path')
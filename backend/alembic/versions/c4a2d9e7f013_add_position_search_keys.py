@@ -0,0 +1,67 @@
+"""Add normalized board and material keys for position search
+
+Revision ID: c4a2d9e7f013
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-19 11:04:17.553902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from chess_utils import position_keys
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a2d9e7f013'
+down_revision: Union[str, Sequence[str], None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('positions', sa.Column('board_key', sa.String(length=100), nullable=True))
+    op.add_column('positions', sa.Column('material_key', sa.String(length=40), nullable=True))
+
+    # Backfill existing rows in batches using the same normalization as the app
+    positions = sa.table(
+        'positions',
+        sa.column('id', sa.Integer),
+        sa.column('fen', sa.String),
+        sa.column('board_key', sa.String),
+        sa.column('material_key', sa.String),
+    )
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(positions.c.id, positions.c.fen)
+            .where(positions.c.id > last_id)
+            .order_by(positions.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        bind.execute(
+            positions.update().where(positions.c.id == sa.bindparam('row_id')),
+            [{'row_id': row.id, **position_keys(row.fen)} for row in rows]
+        )
+
+    op.create_index(
+        'ix_positions_user_board_key', 'positions', ['user_id', 'board_key'], unique=False,
+        postgresql_ops={'board_key': 'varchar_pattern_ops'}
+    )
+    op.create_index('ix_positions_user_material_key', 'positions', ['user_id', 'material_key'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_positions_user_material_key', table_name='positions')
+    op.drop_index('ix_positions_user_board_key', table_name='positions')
+    op.drop_column('positions', 'material_key')
+    op.drop_column('positions', 'board_key')
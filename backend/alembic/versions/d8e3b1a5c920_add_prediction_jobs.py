@@ -0,0 +1,45 @@
+"""Add prediction_jobs queue table
+
+Revision ID: d8e3b1a5c920
+Revises: c4a2d9e7f013
+Create Date: 2026-10-19 13:26:08.917244
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8e3b1a5c920'
+down_revision: Union[str, Sequence[str], None] = 'c4a2d9e7f013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('prediction_jobs',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('owner_key', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('image', sa.LargeBinary(), nullable=True),
+    sa.Column('fen', sa.String(length=100), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('max_attempts', sa.Integer(), nullable=False),
+    sa.Column('locked_until', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_prediction_jobs_owner_key'), 'prediction_jobs', ['owner_key'], unique=False)
+    op.create_index('ix_prediction_jobs_status_locked_until', 'prediction_jobs', ['status', 'locked_until'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_prediction_jobs_status_locked_until', table_name='prediction_jobs')
+    op.drop_index(op.f('ix_prediction_jobs_owner_key'), table_name='prediction_jobs')
+    op.drop_table('prediction_jobs')
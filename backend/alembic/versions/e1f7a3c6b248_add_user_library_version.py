@@ -0,0 +1,30 @@
+"""Add per-user library version for HTTP caching
+
+Revision ID: e1f7a3c6b248
+Revises: d8e3b1a5c920
+Create Date: 2026-10-19 15:41:52.306118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f7a3c6b248'
+down_revision: Union[str, Sequence[str], None] = 'd8e3b1a5c920'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('library_version', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('library_updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'library_updated_at')
+    op.drop_column('users', 'library_version')
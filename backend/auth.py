@@ -16,6 +16,8 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # 2. Setup OAuth2 for FastAPI
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
+# Same scheme, but lets anonymous requests through (for endpoints where login is optional)
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login", auto_error=False)
 
 def verify_password(plain_password, hashed_password):
     """Check if the provided password matches the hashed one in the database."""
@@ -67,4 +69,13 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     if user is None:
         raise credentials_exception
         
-    return user
\ No newline at end of file
+    return user
+
+async def get_optional_user(token: Optional[str] = Depends(optional_oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    """
+    Like get_current_user, but returns None for anonymous requests
+    instead of rejecting them. An invalid token is still an error.
+    """
+    if token is None:
+        return None
+    return await get_current_user(token=token, db=db)
@@ -0,0 +1,47 @@
+import chess
+
+# Piece order used when building material signatures, strongest first
+MATERIAL_ORDER = "KQRBNP"
+
+
+def normalize_fen(fen: str) -> str:
+    """
+    Validates a FEN with python-chess and returns it in canonical form.
+    Raises ValueError if the FEN can't be parsed.
+    """
+    return chess.Board(fen.strip()).fen()
+
+
+def board_key(fen: str) -> str:
+    """Piece placement only (the first FEN field), e.g. for "have I saved this already?"."""
+    try:
+        return chess.Board(fen.strip()).board_fen()
+    except ValueError:
+        # Older rows were stored without validation; fall back to the raw field
+        return fen.strip().split(" ")[0]
+
+
+def material_key(fen: str) -> str:
+    """
+    Material signature such as "KRP_KR" (white pieces, then black).
+    Lets the library answer queries like "all R+P vs R endgames".
+    """
+    placement = board_key(fen)
+    white = "".join(p * placement.count(p) for p in MATERIAL_ORDER)
+    black = "".join(p * placement.count(p.lower()) for p in MATERIAL_ORDER)
+    return f"{white}_{black}"
+
+
+def normalize_material(signature: str) -> str:
+    """Accepts "KRPvKR", "krp_kr" or "KPR vs KR" and returns the stored "KRP_KR" form."""
+    cleaned = signature.upper().replace("VS", "V").replace(" ", "").replace("_", "V")
+    sides = cleaned.split("V")
+    if len(sides) != 2 or any(c not in MATERIAL_ORDER for c in "".join(sides)):
+        raise ValueError("Material signature must look like KRPvKR")
+    ordered = ["".join(sorted(side, key=MATERIAL_ORDER.index)) for side in sides]
+    return "_".join(ordered)
+
+
+def position_keys(fen: str) -> dict:
+    """Derived search columns stored alongside every Position."""
+    return {"board_key": board_key(fen), "material_key": material_key(fen)}
@@ -3,6 +3,10 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
+
+    DATABASE_ECHO: bool = True
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
     
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -11,6 +15,45 @@ class Settings(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str = ""
     AWS_REGION: str = "ap-southeast-1"
     AWS_BUCKET_NAME: str = ""
+    # Point this at MinIO/LocalStack to use a local S3 stand-in
+    AWS_ENDPOINT_URL: str = ""
+
+    # Direct-to-S3 uploads
+    PRESIGNED_URL_EXPIRE_SECONDS: int = 300
+    MAX_UPLOAD_BYTES: int = 10 * 1024 * 1024
+
+    # Bulk import/export
+    BULK_CHUNK_SIZE: int = 1000
+
+    # Async prediction jobs (Postgres-backed queue)
+    JOB_VISIBILITY_TIMEOUT_SECONDS: int = 60
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_RETRY_DELAY_SECONDS: int = 5
+    JOB_MAX_ACTIVE_PER_USER: int = 10
+    JOB_MAX_RUNNING_PER_USER: int = 2
+    JOB_WORKER_POLL_SECONDS: float = 0.5
+    JOB_REAP_INTERVAL_SECONDS: int = 30
+    JOB_LONG_POLL_MAX_SECONDS: int = 30
+
+    # Video / live-stream board tracking
+    TRACK_CHANGE_THRESHOLD: float = 12.0
+    TRACK_STABLE_FRAMES: int = 2
+    TRACK_MAX_VIDEO_BYTES: int = 200 * 1024 * 1024
+
+    # Inference rate limiting (token bucket per user, or per IP when anonymous)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" (single replica) or "postgres" (shared)
+    PREDICT_RATE_LIMIT_PER_MINUTE: int = 30
+    PREDICT_RATE_LIMIT_BURST: int = 10
+
+    # Fair (round-robin per user) scheduling in front of the model
+    INFERENCE_WORKERS: int = 1
+    INFERENCE_MAX_QUEUED_PER_USER: int = 4
+
+    # Library thumbnails ("WEBP" or "JPEG")
+    THUMBNAIL_SIZE: int = 256
+    THUMBNAIL_FORMAT: str = "WEBP"
+    THUMBNAIL_QUALITY: int = 80
 
     class Config:
         env_file = ".env"
@@ -4,7 +4,12 @@ from config import settings
 
 # 1. Create the async engine
 # echo=True will print all SQL queries to the terminal
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = create_async_engine(
+    settings.DATABASE_URL,
+    echo=settings.DATABASE_ECHO,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_overflow=settings.DATABASE_MAX_OVERFLOW
+)
 
 # 2. Create a session factory
 # This will spawn a new database session for every request
@@ -0,0 +1,139 @@
+"""
+Postgres-backed prediction job queue.
+
+Workers claim jobs with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+worker processes can share the table without handing out the same job twice.
+A claimed job is leased until `locked_until`; if the worker dies, the lease
+expires and another worker picks the job up again (up to max_attempts).
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, update, func, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+from config import settings
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+async def count_active_jobs(db: AsyncSession, owner_key: str) -> int:
+    query = select(func.count()).select_from(models.PredictionJob).where(
+        models.PredictionJob.owner_key == owner_key,
+        models.PredictionJob.status.in_(ACTIVE_STATUSES)
+    )
+    return (await db.execute(query)).scalar_one()
+
+
+async def enqueue_job(db: AsyncSession, owner_key: str, image: bytes) -> models.PredictionJob:
+    job = models.PredictionJob(
+        owner_key=owner_key,
+        status="queued",
+        image=image,
+        attempts=0,
+        max_attempts=settings.JOB_MAX_ATTEMPTS
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def claim_job(db: AsyncSession) -> Optional[models.PredictionJob]:
+    """
+    Leases the oldest runnable job, skipping rows other workers hold locks on
+    and owners already at JOB_MAX_RUNNING_PER_USER running jobs.
+    """
+    Job = models.PredictionJob
+    now = func.now()
+
+    busy_owners = (
+        select(Job.owner_key)
+        .where(Job.status == "running", Job.locked_until > now)
+        .group_by(Job.owner_key)
+        .having(func.count() >= settings.JOB_MAX_RUNNING_PER_USER)
+    )
+
+    candidate = (
+        select(Job.id)
+        .where(
+            Job.locked_until <= now,
+            Job.attempts < Job.max_attempts,
+            # Queued jobs, or running ones whose worker let the lease expire
+            Job.status.in_(ACTIVE_STATUSES),
+            Job.owner_key.not_in(busy_owners)
+        )
+        .order_by(Job.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+
+    lease = timedelta(seconds=settings.JOB_VISIBILITY_TIMEOUT_SECONDS)
+    result = await db.execute(
+        update(Job)
+        .where(Job.id == candidate)
+        .values(status="running", attempts=Job.attempts + 1, locked_until=now + lease)
+        .returning(Job)
+        .execution_options(synchronize_session=False)
+    )
+    job = result.scalars().first()
+    await db.commit()
+    return job
+
+
+def _held_lease(job_id: str, attempts: int):
+    """
+    Matches the job only while it's still the caller's claim. A worker that ran
+    past its lease mustn't overwrite a job that was reaped or re-claimed since.
+    """
+    Job = models.PredictionJob
+    return and_(Job.id == job_id, Job.status == "running", Job.attempts == attempts)
+
+
+async def complete_job(db: AsyncSession, job_id: str, attempts: int, fen: str) -> bool:
+    """Returns False if the lease was lost and the result was discarded."""
+    result = await db.execute(
+        update(models.PredictionJob)
+        .where(_held_lease(job_id, attempts))
+        .values(status="done", fen=fen, image=None, error=None, finished_at=func.now())
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def fail_job(db: AsyncSession, job_id: str, attempts: int, max_attempts: int, error: str) -> bool:
+    """
+    Schedules a retry after JOB_RETRY_DELAY_SECONDS, or gives up after max_attempts.
+    Returns False if the lease was lost and the job was left alone.
+    """
+    if attempts >= max_attempts:
+        values = dict(status="failed", error=error, image=None, finished_at=func.now())
+    else:
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=settings.JOB_RETRY_DELAY_SECONDS)
+        values = dict(status="queued", error=error, locked_until=retry_at)
+
+    result = await db.execute(
+        update(models.PredictionJob)
+        .where(_held_lease(job_id, attempts))
+        .values(**values)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def reap_expired_jobs(db: AsyncSession) -> int:
+    """Marks jobs whose last lease expired with no attempts left as failed."""
+    Job = models.PredictionJob
+    result = await db.execute(
+        update(Job)
+        .where(and_(
+            Job.status == "running",
+            Job.locked_until <= func.now(),
+            Job.attempts >= Job.max_attempts
+        ))
+        .values(status="failed", error="Worker timed out", image=None, finished_at=func.now())
+    )
+    await db.commit()
+    return result.rowcount
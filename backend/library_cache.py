@@ -0,0 +1,95 @@
+"""
+HTTP caching for library reads.
+
+Every user carries a library_version counter that each create/patch/delete
+bumps in the same transaction as the change. ETags are derived from it, so a
+conditional GET can be answered with 304 straight from the user row that
+get_current_user already loaded, without touching the positions table.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import List, Optional
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+import schemas
+
+# pydantic-core serializes straight to JSON bytes, skipping jsonable_encoder
+_positions_adapter = TypeAdapter(List[schemas.PositionResponse])
+
+
+async def bump_library_version(db: AsyncSession, user_id: int):
+    """Call before committing any change to the user's positions."""
+    await db.execute(
+        update(models.User)
+        .where(models.User.id == user_id)
+        .values(
+            library_version=models.User.library_version + 1,
+            library_updated_at=func.now()
+        )
+    )
+
+
+def library_etag(user: models.User, *parts) -> str:
+    """Weak ETag for a view of the library, e.g. library_etag(user, "board", 12)."""
+    # Parts can be arbitrary query values (e.g. a category), so hash them into a safe token
+    view = hashlib.sha1(repr(parts).encode()).hexdigest()[:12]
+    return f'W/"lib-{user.id}-{user.library_version}-{view}"'
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite hands timestamps back naive; the server wrote them in UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _cache_headers(user: models.User, etag: str) -> dict:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if user.library_updated_at:
+        headers["Last-Modified"] = format_datetime(_as_utc(user.library_updated_at), usegmt=True)
+    return headers
+
+
+def _is_fresh(request: Request, user: models.User, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and user.library_updated_at:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return _as_utc(user.library_updated_at).replace(microsecond=0) <= _as_utc(since)
+    return False
+
+
+def not_modified_response(request: Request, user: models.User, etag: str) -> Optional[Response]:
+    """Returns a 304 if the client's cached copy is still current, else None."""
+    if _is_fresh(request, user, etag):
+        return Response(status_code=304, headers=_cache_headers(user, etag))
+    return None
+
+
+def positions_response(positions, user: models.User, etag: str) -> Response:
+    return Response(
+        content=_positions_adapter.dump_json(positions),
+        media_type="application/json",
+        headers=_cache_headers(user, etag)
+    )
+
+
+def position_response(position, user: models.User, etag: str) -> Response:
+    return Response(
+        content=schemas.PositionResponse.model_validate(position).model_dump_json(),
+        media_type="application/json",
+        headers=_cache_headers(user, etag)
+    )
@@ -0,0 +1,16 @@
+"""
+Environment defaults for load testing. Import this before anything that
+reads config.settings (main, database, routers...).
+"""
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///./loadtest.db")
+os.environ.setdefault("SECRET_KEY", "loadtest-secret-key")
+os.environ.setdefault("AWS_BUCKET_NAME", "loadtest")
+# SQL echo would dominate the numbers
+os.environ.setdefault("DATABASE_ECHO", "false")
+# Measure the server, not the per-client throttle
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+# Where the filesystem S3 stand-in keeps its objects
+S3_ROOT = os.environ.get("LOADTEST_S3_ROOT", "./loadtest_s3")
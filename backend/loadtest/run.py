@@ -0,0 +1,154 @@
+"""
+Load test for the ChessLens API.
+
+Each virtual user registers, logs in, then repeats the library flow:
+predict -> upload -> list library -> patch -> delete. Latencies are recorded
+per route and reported at every concurrency level.
+
+In-process (default): drives main.app through httpx's ASGI transport with a
+stub model, SQLite (or DATABASE_URL) and a filesystem S3 stand-in. Note the
+client shares the event loop with the app, so absolute numbers are pessimistic.
+
+    python -m loadtest.run --concurrency 1 5 10 25 --iterations 5 --predict-latency 0.05
+
+Against a running server (e.g. python -m loadtest.serve, or a real deploy):
+
+    python -m loadtest.run --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import io
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from loadtest import env  # noqa: F401 - must come before importing the app
+import httpx
+from PIL import Image
+
+from loadtest.stubs import create_tables, install_stubs, load_predictor, new_username, random_board_fen
+
+PASSWORD = "loadtest-password"
+
+
+def make_board_png() -> bytes:
+    """A 400x400 checkerboard, the same shape the model expects."""
+    img = Image.new("RGB", (400, 400), (240, 217, 181))
+    for row in range(8):
+        for col in range(8):
+            if (row + col) % 2:
+                img.paste((181, 136, 99), (col * 50, row * 50, (col + 1) * 50, (row + 1) * 50))
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+class Recorder:
+    """Collects per-route latencies and error counts."""
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, route: str, request):
+        start = time.perf_counter()
+        try:
+            response = await request
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.latencies[route].append(time.perf_counter() - start)
+        if not ok:
+            self.errors[route] += 1
+        return response if ok else None
+
+
+async def user_flow(client: httpx.AsyncClient, recorder: Recorder, image: bytes, iterations: int):
+    username = new_username()
+    registered = await recorder.call("POST /auth/register", client.post(
+        "/api/auth/register",
+        json={"username": username, "email": f"{username}@example.com", "password": PASSWORD}
+    ))
+    if registered is None:
+        return
+
+    login = await recorder.call("POST /auth/login", client.post(
+        "/api/auth/login", data={"username": username, "password": PASSWORD}
+    ))
+    if login is None:
+        return
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    files = lambda: {"file": ("board.png", image, "image/png")}
+
+    for _ in range(iterations):
+        await recorder.call("POST /ai/predict", client.post("/api/ai/predict", files=files(), headers=headers))
+
+        # Fresh placement per upload so dedup doesn't short-circuit the S3 write
+        fen = f"{random_board_fen()} w - - 0 1"
+        uploaded = await recorder.call("POST /fen/upload", client.post(
+            "/api/fen/upload", files=files(), data={"fen": fen}, headers=headers
+        ))
+
+        await recorder.call("GET /fen/library", client.get("/api/fen/library", headers=headers))
+
+        if uploaded is None:
+            continue
+        board_id = uploaded.json()["id"]
+        await recorder.call("PATCH /fen/library/{id}", client.patch(
+            f"/api/fen/library/{board_id}", json={"notes": "load test"}, headers=headers
+        ))
+        await recorder.call("DELETE /fen/library/{id}", client.delete(
+            f"/api/fen/library/{board_id}", headers=headers
+        ))
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def report(concurrency: int, elapsed: float, recorder: Recorder):
+    print(f"\n=== concurrency {concurrency} ({elapsed:.1f}s) ===")
+    print(f"{'route':<28}{'count':>7}{'errors':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for route, values in recorder.latencies.items():
+        values = sorted(values)
+        print(
+            f"{route:<28}{len(values):>7}{recorder.errors[route]:>8}{len(values) / elapsed:>9.1f}"
+            f"{percentile(values, 50) * 1000:>9.1f}{percentile(values, 95) * 1000:>9.1f}"
+            f"{percentile(values, 99) * 1000:>9.1f}{values[-1] * 1000:>9.1f}"
+        )
+
+
+async def run(args):
+    image = make_board_png()
+
+    if args.base_url:
+        transport, base_url = None, args.base_url
+    else:
+        from main import app
+        await create_tables()
+        install_stubs(app, load_predictor(args.model, args.predict_latency))
+        transport, base_url = httpx.ASGITransport(app=app), "http://loadtest"
+
+    for concurrency in args.concurrency:
+        recorder = Recorder()
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60, limits=limits) as client:
+            start = time.perf_counter()
+            await asyncio.gather(*[
+                user_flow(client, recorder, image, args.iterations) for _ in range(concurrency)
+            ])
+            report(concurrency, time.perf_counter() - start, recorder)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the ChessLens API.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 5, 10, 25])
+    parser.add_argument("--iterations", type=int, default=5, help="Library flows per virtual user")
+    parser.add_argument("--model", choices=["stub", "real"], default="stub")
+    parser.add_argument("--predict-latency", type=float, default=0.05, help="Stub inference time in seconds")
+    parser.add_argument("--base-url", help="Hit a running server instead of main.app in-process")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""
+Run the real FastAPI app with the load-test stand-ins, for driving from
+another process/machine (python -m loadtest.run --base-url ...):
+
+    python -m loadtest.serve --model stub --predict-latency 0.05
+"""
+import argparse
+
+from loadtest import env  # noqa: F401 - must come before importing the app
+import uvicorn
+
+from loadtest.stubs import load_predictor, stub_lifespan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve main.app with load-test stubs.")
+    parser.add_argument("--model", choices=["stub", "real"], default="stub")
+    parser.add_argument("--predict-latency", type=float, default=0.05, help="Stub inference time in seconds")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    from main import app
+    app.router.lifespan_context = stub_lifespan(load_predictor(args.model, args.predict_latency))
+
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import io
+import os
+import random
+import shutil
+import time
+import uuid
+
+from contextlib import asynccontextmanager
+
+import chess
+
+from loadtest.env import S3_ROOT
+
+
+class StubPredictor:
+    """
+    Stand-in for ChessPredictor. Sleeps for `latency` seconds (blocking, like
+    real TFLite inference does) and returns a random legal-looking FEN.
+    """
+    def __init__(self, latency: float = 0.05):
+        self.latency = latency
+
+    def predict(self, image_path) -> str:
+        if self.latency:
+            time.sleep(self.latency)
+        return f"{random_board_fen()} w - - 0 1"
+
+
+def random_board_fen() -> str:
+    """Kings plus a few random pieces, so uploads don't all dedup to one board."""
+    board = chess.Board.empty()
+    squares = random.sample(range(8, 56), 6)
+    board.set_piece_at(squares[0], chess.Piece(chess.KING, chess.WHITE))
+    board.set_piece_at(squares[1], chess.Piece(chess.KING, chess.BLACK))
+    for square in squares[2:]:
+        piece_type = random.choice([chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN])
+        board.set_piece_at(square, chess.Piece(piece_type, random.choice([chess.WHITE, chess.BLACK])))
+    return board.board_fen()
+
+
+class FakeS3Client:
+    """Filesystem stand-in for the handful of boto3 S3 calls the app makes."""
+    def __init__(self, root: str = S3_ROOT):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, bucket: str, key: str) -> str:
+        path = os.path.join(self.root, bucket, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def put_object(self, Bucket, Key, Body, ContentType=None, **kwargs):
+        with open(self._path(Bucket, Key), "wb") as f:
+            f.write(Body)
+        return {}
+
+    def upload_fileobj(self, Fileobj, Bucket, Key, ExtraArgs=None):
+        with open(self._path(Bucket, Key), "wb") as f:
+            shutil.copyfileobj(Fileobj, f)
+
+    def get_object(self, Bucket, Key):
+        with open(self._path(Bucket, Key), "rb") as f:
+            return {"Body": io.BytesIO(f.read())}
+
+    def head_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if not os.path.exists(path):
+            raise FileNotFoundError(Key)
+        return {"ContentLength": os.path.getsize(path)}
+
+    def delete_object(self, Bucket, Key):
+        path = self._path(Bucket, Key)
+        if os.path.exists(path):
+            os.remove(path)
+        return {}
+
+    def generate_presigned_post(self, Bucket, Key, Fields=None, Conditions=None, ExpiresIn=3600):
+        return {"url": f"file://{os.path.abspath(os.path.join(self.root, Bucket))}", "fields": {"key": Key, **(Fields or {})}}
+
+
+def install_stubs(app, predictor) -> FakeS3Client:
+    """Swaps the real S3 client and model for the load-test stand-ins."""
+    import storage
+    from config import settings
+    from ml.scheduler import FairScheduler
+    from routers import fen
+
+    fake_s3 = FakeS3Client()
+    storage.s3_client = fake_s3
+    fen.s3_client = fake_s3
+    app.state.piece_classifier = predictor
+    app.state.inference_scheduler = FairScheduler(
+        workers=settings.INFERENCE_WORKERS,
+        max_queued_per_key=settings.INFERENCE_MAX_QUEUED_PER_USER
+    )
+    return fake_s3
+
+
+def load_predictor(model: str, latency: float):
+    """"stub" for StubPredictor, "real" for the bundled .tflite model."""
+    if model == "real":
+        from ml.predictor import ChessPredictor
+        return ChessPredictor("ml/piece_classifier_model.tflite")
+    return StubPredictor(latency)
+
+
+async def create_tables():
+    import models  # noqa: F401 - registers the tables on Base.metadata
+    from database import Base, engine
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+def new_username() -> str:
+    return f"lt_{uuid.uuid4().hex[:12]}"
+
+
+def stub_lifespan(predictor):
+    """Replacement for main.lifespan: create tables and install the stand-ins."""
+    @asynccontextmanager
+    async def lifespan(app):
+        await create_tables()
+        install_stubs(app, predictor)
+        yield
+
+    return lifespan
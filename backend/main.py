@@ -1,10 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 import os
 
 from ml.predictor import ChessPredictor 
-from routers import auth, positions, fen, predict
+from ml.scheduler import FairScheduler
+from config import settings
+from routers import auth, positions, fen, predict, track
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -18,10 +21,17 @@ async def lifespan(app: FastAPI):
     else:
         print(f"⚠️ WARNING: Model not found at {model_path}. AI features will not work.")
         app.state.piece_classifier = None
+
+    # Round-robin queue in front of the model so one heavy client can't starve the rest
+    app.state.inference_scheduler = FairScheduler(
+        workers=settings.INFERENCE_WORKERS,
+        max_queued_per_key=settings.INFERENCE_MAX_QUEUED_PER_USER
+    )
     
     yield
     
     # Clean up on shutdown
+    await app.state.inference_scheduler.stop()
     if getattr(app.state, "piece_classifier", None):
         del app.state.piece_classifier
     print("🛑 Model unloaded.")
@@ -49,11 +59,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (library listings, exports)
+app.add_middleware(GZipMiddleware, minimum_size=1000)
+
 # This mounts all routes from auth.py under the /api/auth prefix
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(positions.router, prefix="/api/positions", tags=["Positions"])
 app.include_router(fen.router, prefix="/api/fen", tags=["Image Upload"])
 app.include_router(predict.router, prefix="/api/ai", tags=["FEN Extraction"])
+app.include_router(track.router, prefix="/api/ai", tags=["Board Tracking"])
 
 @app.get("/")
 async def health_check():
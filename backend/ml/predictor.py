@@ -3,6 +3,55 @@ import numpy as np
 import cv2
 from PIL import Image
 import os
+import threading
+from functools import lru_cache
+from typing import List
+
+# FEN character for each model output index ('1' = empty square)
+FEN_CHARS = '1PNBRQKpnbrqk'
+NUM_CLASSES = len(FEN_CHARS)
+
+# Rank index -> base-13 code weights, so each 8-square rank becomes one integer
+# (13^8 < 2^31, so int64 never overflows)
+_RANK_WEIGHTS = NUM_CLASSES ** np.arange(7, -1, -1, dtype=np.int64)
+
+
+@lru_cache(maxsize=65536)
+def _rank_code_to_fen(code: int) -> str:
+    """Run-length encodes one rank given its base-13 code. Memoized: real boards reuse few rank patterns."""
+    out = []
+    empty_count = 0
+    for weight in _RANK_WEIGHTS:
+        piece = FEN_CHARS[(code // int(weight)) % NUM_CLASSES]
+        if piece == '1':
+            empty_count += 1
+        else:
+            if empty_count:
+                out.append(str(empty_count))
+                empty_count = 0
+            out.append(piece)
+    if empty_count:
+        out.append(str(empty_count))
+    return ''.join(out)
+
+
+def predictions_to_fens(predictions) -> List[str]:
+    """
+    Vectorized board post-processing: (N, 64) class indices -> N piece-placement FENs.
+    Each rank is packed into a base-13 integer with one matmul; only the unique
+    rank codes go through Python, and those hit the memoized encoder.
+    """
+    preds = np.asarray(predictions, dtype=np.int64).reshape(-1, 8, 8)
+    # Unknown class indices are treated as empty squares
+    preds = np.where((preds >= 0) & (preds < NUM_CLASSES), preds, 0)
+
+    codes = preds @ _RANK_WEIGHTS  # (N, 8)
+    unique_codes, inverse = np.unique(codes, return_inverse=True)
+    rank_strings = np.array([_rank_code_to_fen(int(c)) for c in unique_codes], dtype=object)
+    ranks = rank_strings[inverse.reshape(codes.shape)]
+
+    return ['/'.join(board) for board in ranks]
+
 
 class ChessPredictor:
     def __init__(self, model_path: str):
@@ -15,39 +64,46 @@ class ChessPredictor:
         self.interpreter.allocate_tensors()
         self.input_details = self.interpreter.get_input_details()
         self.output_details = self.interpreter.get_output_details()
+        # The interpreter isn't thread-safe; predict and stream tracking share it
+        self._lock = threading.Lock()
 
         # Constants matching your training logic
         self.BOARD_SIZE = 400
         self.SQUARE_SIZE = 50
         
         # Mapping from model output index to FEN character
-        self.PIECE_MAP = {
-            0: '1',   # Empty square
-            1: 'P', 2: 'N', 3: 'B', 4: 'R', 5: 'Q', 6: 'K',  # White pieces
-            7: 'p', 8: 'n', 9: 'b', 10: 'r', 11: 'q', 12: 'k'  # Black pieces
-        }
+        self.PIECE_MAP = dict(enumerate(FEN_CHARS))
 
-    def predict(self, image_path: str) -> str:
+    def predict(self, image_path) -> str:
         """
-        Main entry point: Takes an image path, returns a FEN string.
+        Main entry point: Takes an image path (or file-like object), returns a FEN string.
         """
-        # 1. Load and Preprocess Image
-        img = Image.open(image_path).convert('RGB')
-        
-        # Force resize to 400x400 so your slicing logic works perfectly
-        img = img.resize((self.BOARD_SIZE, self.BOARD_SIZE))
-        
-        # 2. Extract the 64 squares
-        squares = self._extract_squares(img)
-        
-        # 3. Run Inference on all squares
-        predictions = self._run_batch_inference(squares)
-        
+        return self.predict_batch([image_path])[0]
+
+    def predict_batch(self, image_paths) -> List[str]:
+        """
+        Takes several image paths (or file-like objects), returns one FEN per image.
+        FEN assembly for the whole batch happens in a single vectorized pass.
+        """
+        predictions = []
+        for image_path in image_paths:
+            # 1. Load and Preprocess Image
+            img = Image.open(image_path).convert('RGB')
+
+            # Force resize to 400x400 so your slicing logic works perfectly
+            img = img.resize((self.BOARD_SIZE, self.BOARD_SIZE))
+
+            # 2. Extract the 64 squares
+            squares = self._extract_squares(img)
+
+            # 3. Run Inference on all squares
+            predictions.append(self.classify_squares(squares))
+
         # 4. Convert predictions to FEN
-        fen = self._to_fen(predictions)
-        
+        fens = predictions_to_fens(np.array(predictions).reshape(-1, 64))
+
         # 5. Add default turn info (White to move, full castling rights)
-        return f"{fen} w KQkq - 0 1"
+        return [f"{fen} w KQkq - 0 1" for fen in fens]
 
     def _extract_squares(self, img):
         # Convert PIL to numpy (RGB)
@@ -72,6 +128,11 @@ class ChessPredictor:
                 squares.append(square)
         return squares
 
+    def classify_squares(self, squares) -> np.ndarray:
+        """Classifies grayscale 50x50 squares, returning one class index per square."""
+        with self._lock:
+            return np.array(self._run_batch_inference(squares), dtype=np.int64)
+
     def _run_batch_inference(self, squares):
         predictions = []
         
@@ -96,26 +157,4 @@ class ChessPredictor:
         return predictions
 
     def _to_fen(self, predictions):
-        fen = ""
-        for row in range(8):
-            empty_count = 0
-            # Get the 8 predictions for this rank
-            row_preds = predictions[row * 8 : (row + 1) * 8]
-            
-            for pred in row_preds:
-                piece = self.PIECE_MAP.get(pred, '1')
-                
-                if piece == '1':
-                    empty_count += 1
-                else:
-                    if empty_count > 0:
-                        fen += str(empty_count)
-                        empty_count = 0
-                    fen += piece
-            
-            if empty_count > 0:
-                fen += str(empty_count)
-                
-            if row < 7:
-                fen += '/'
-        return fen
\ No newline at end of file
+        return predictions_to_fens(predictions)[0]
@@ -0,0 +1,81 @@
+import asyncio
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when a client already has its maximum number of requests waiting."""
+
+
+class FairScheduler:
+    """
+    Round-robin scheduler in front of the model.
+
+    Each client key gets its own FIFO queue, and workers take one request from
+    each waiting client in turn. A client that floods the endpoint only makes
+    its own queue longer: a light user's request waits for at most one request
+    per other active client, not for the whole backlog.
+    Inference runs in worker threads so the event loop stays responsive.
+    """
+    def __init__(self, workers: int = 1, max_queued_per_key: int = 4):
+        self.workers = workers
+        self.max_queued_per_key = max_queued_per_key
+        self._queues: "OrderedDict[str, Deque]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks = []
+
+    def _ensure_started(self):
+        # Started lazily so the scheduler can be created outside a running loop
+        if not self._tasks:
+            self._wakeup = asyncio.Event()
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    def queued(self, key: str) -> int:
+        return len(self._queues.get(key, ()))
+
+    async def submit(self, key: str, fn: Callable, *args):
+        """Queues fn(*args) for `key` and waits for its result."""
+        self._ensure_started()
+        if self.queued(key) >= self.max_queued_per_key:
+            raise QueueFullError(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(key, deque()).append((fn, args, future))
+        self._wakeup.set()
+        return await future
+
+    def _next(self):
+        """Pops the next request, rotating the served client to the back of the line."""
+        while self._queues:
+            key, queue = next(iter(self._queues.items()))
+            self._queues.move_to_end(key)
+            item = queue.popleft()
+            if not queue:
+                del self._queues[key]
+            if not item[2].cancelled():
+                return item
+        return None
+
+    async def _worker(self):
+        while True:
+            item = self._next()
+            if item is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            fn, args, future = item
+            try:
+                result = await asyncio.to_thread(fn, *args)
+            except Exception as e:
+                if not future.cancelled():
+                    future.set_exception(e)
+            else:
+                if not future.cancelled():
+                    future.set_result(result)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
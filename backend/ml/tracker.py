@@ -0,0 +1,141 @@
+import cv2
+import numpy as np
+import chess
+from typing import Callable, Optional, Tuple
+
+from ml.predictor import ChessPredictor, predictions_to_fens
+
+
+class BoardTracker:
+    """
+    Incremental board tracking over a stream of video frames.
+
+    The board region is fixed for the whole stream (either the full frame or a
+    client-supplied box), so the crop is reused frame to frame. Only squares whose
+    pixels changed by more than `change_threshold` (mean absolute grey-level
+    difference, 0-255) since they were last classified go through the model, so
+    a static board costs a resize and a diff per frame.
+
+    An event is emitted only when the detected placement changes and has been
+    stable for `stable_frames` frames (hands and half-dragged pieces are ignored).
+    If the change is a legal move from the previous position it's reported as a
+    move, otherwise as a new position.
+
+    `classify` replaces predictor.classify_squares for the actual inference call,
+    e.g. to route it through the shared FairScheduler.
+    """
+    def __init__(
+        self,
+        predictor: ChessPredictor,
+        board_box: Optional[Tuple[int, int, int, int]] = None,
+        change_threshold: float = 12.0,
+        stable_frames: int = 2,
+        classify: Optional[Callable[[np.ndarray], np.ndarray]] = None
+    ):
+        self.predictor = predictor
+        self.classify = classify or predictor.classify_squares
+        self.board_box = board_box
+        self.change_threshold = change_threshold
+        self.stable_frames = stable_frames
+
+        self.board_size = predictor.BOARD_SIZE
+        self.square_size = predictor.SQUARE_SIZE
+
+        self._reference_squares = None  # Pixels each square was last classified from
+        self._classes = np.zeros(64, dtype=np.int64)
+        self._candidate = None
+        self._candidate_frames = 0
+        self.board: Optional[chess.Board] = None  # Last emitted position
+        self._turn_known = False  # A bare position doesn't say who is to move
+        self.frames_processed = 0
+        self.squares_classified = 0
+
+    def _squares(self, frame: np.ndarray) -> np.ndarray:
+        """BGR/grey frame -> (64, 50, 50) grey squares, row-major from a8."""
+        if self.board_box:
+            x, y, w, h = self.board_box
+            frame_h, frame_w = frame.shape[:2]
+            if x + w > frame_w or y + h > frame_h:
+                raise ValueError(f"Board box {self.board_box} lies outside the {frame_w}x{frame_h} frame")
+            frame = frame[y:y + h, x:x + w]
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        board = cv2.resize(frame, (self.board_size, self.board_size), interpolation=cv2.INTER_AREA)
+        s = self.square_size
+        return board.reshape(8, s, 8, s).swapaxes(1, 2).reshape(64, s, s)
+
+    def process_frame(self, frame: np.ndarray, timestamp: Optional[float] = None) -> Optional[dict]:
+        """
+        Feeds one frame; returns a move/position event dict, or None if nothing changed.
+        Raises ValueError if the board box doesn't fit inside the frame.
+        """
+        self.frames_processed += 1
+        squares = self._squares(frame)
+
+        # 1. Work out which squares changed since they were last classified
+        if self._reference_squares is None:
+            changed = np.ones(64, dtype=bool)
+        else:
+            diff = np.abs(squares.astype(np.int16) - self._reference_squares.astype(np.int16))
+            changed = diff.reshape(64, -1).mean(axis=1) > self.change_threshold
+
+        # 2. Re-classify only those
+        if changed.any():
+            self._classes[changed] = self.classify(squares[changed])
+            if self._reference_squares is None:
+                self._reference_squares = squares.copy()
+            else:
+                self._reference_squares[changed] = squares[changed]
+            self.squares_classified += int(changed.sum())
+
+        placement = predictions_to_fens(self._classes)[0]
+
+        # 3. Debounce: wait until the new placement holds for a few frames
+        if self.board is not None and placement == self.board.board_fen():
+            self._candidate, self._candidate_frames = None, 0
+            return None
+        if placement != self._candidate:
+            self._candidate, self._candidate_frames = placement, 1
+        else:
+            self._candidate_frames += 1
+        if self._candidate_frames < self.stable_frames:
+            return None
+
+        self._candidate, self._candidate_frames = None, 0
+        return self._emit(placement, timestamp)
+
+    def _emit(self, placement: str, timestamp: Optional[float]) -> dict:
+        event = {"timestamp": timestamp}
+
+        # A legal move from the last position? Report it as a move.
+        if self.board is not None:
+            candidates = [self.board]
+            if not self._turn_known:
+                flipped = self.board.copy()
+                flipped.turn = not flipped.turn
+                candidates.append(flipped)
+
+            for board in candidates:
+                move = self._find_move(board, placement)
+                if move is not None:
+                    san = board.san(move)
+                    board.push(move)
+                    self.board, self._turn_known = board, True
+                    return {**event, "type": "move", "uci": move.uci(), "san": san, "fen": board.fen()}
+
+        # Otherwise it's a fresh position (first frame, a jump, or a missed move)
+        # Assume castling is still allowed wherever king and rook are on their home squares
+        self.board = chess.Board(f"{placement} w KQkq - 0 1")
+        self.board.castling_rights = self.board.clean_castling_rights()
+        self._turn_known = False
+        return {**event, "type": "position", "fen": self.board.fen()}
+
+    @staticmethod
+    def _find_move(board: chess.Board, placement: str) -> Optional[chess.Move]:
+        for move in board.legal_moves:
+            board.push(move)
+            matched = board.board_fen() == placement
+            board.pop()
+            if matched:
+                return move
+        return None
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime
+import uuid
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, LargeBinary, Float
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -11,6 +12,9 @@ class User(Base):
     email = Column(String(100), unique=True, index=True, nullable=False)
     hashed_password = Column(String(255), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Bumped on every library change; drives ETag / Last-Modified on library reads
+    library_version = Column(Integer, nullable=False, server_default="0", default=0)
+    library_updated_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Establish a bidirectional relationship with the Position model
     positions = relationship("Position", back_populates="owner", cascade="all, delete-orphan")
@@ -22,10 +26,53 @@ class Position(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     fen = Column(String(100), nullable=False)
+    board_key = Column(String(100), nullable=True)    # Piece placement only, for dedup/search
+    material_key = Column(String(40), nullable=True)  # e.g. "KRP_KR"
     category = Column(String(50), index=True) # e.g., "Endgames", "Tactics"
     notes = Column(Text, nullable=True)
     image_path = Column(String(255), nullable=True)
+    thumbnail_path = Column(String(255), nullable=True)   # Small WebP/JPEG for the library grid
+    board_image_path = Column(String(255), nullable=True) # Normalized 400x400 board
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Establish the link back to the User model
-    owner = relationship("User", back_populates="positions")
\ No newline at end of file
+    owner = relationship("User", back_populates="positions")
+
+    __table_args__ = (
+        # varchar_pattern_ops lets the same index serve exact and LIKE 'prefix%' lookups
+        Index(
+            "ix_positions_user_board_key", "user_id", "board_key",
+            postgresql_ops={"board_key": "varchar_pattern_ops"}
+        ),
+        Index("ix_positions_user_material_key", "user_id", "material_key"),
+    )
+
+
+class PredictionJob(Base):
+    __tablename__ = "prediction_jobs"
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    owner_key = Column(String(100), nullable=False, index=True) # "user:<id>" or "ip:<addr>"
+    status = Column(String(20), nullable=False, default="queued") # queued, running, done, failed
+    image = Column(LargeBinary, nullable=True)  # Cleared once the job finishes
+    fen = Column(String(100), nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    # A queued job becomes claimable at this time; a running job is re-claimable after it
+    locked_until = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_prediction_jobs_status_locked_until", "status", "locked_until"),
+    )
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    # Shared token buckets for multi-replica deployments (RATE_LIMIT_BACKEND=postgres)
+    key = Column(String(150), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,181 @@
+"""
+Token-bucket rate limiting for the inference endpoints.
+
+Each client (user id, or IP for anonymous calls) gets a bucket holding up to
+`burst` tokens that refills at `per_minute / 60` tokens per second; every
+request takes one. State lives in a pluggable backend: in-process memory for a
+single replica, or Postgres so several replicas share the same buckets.
+"""
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response
+from starlette.requests import HTTPConnection
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+import models
+from auth import get_optional_user
+from config import settings
+from database import AsyncSessionLocal
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_seconds: int   # Until the bucket is full again
+    retry_after: int     # Until the next request would be allowed (0 if allowed)
+
+    def headers(self) -> Dict[str, str]:
+        headers = {
+            "RateLimit-Limit": str(self.limit),
+            "RateLimit-Remaining": str(self.remaining),
+            "RateLimit-Reset": str(self.reset_seconds),
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(self.remaining),
+            "X-RateLimit-Reset": str(int(time.time()) + self.reset_seconds),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(self.retry_after)
+        return headers
+
+
+class RateLimitBackend(ABC):
+    """Where the buckets live. Subclass this to plug in another shared store."""
+    @abstractmethod
+    async def take(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        """Refills the bucket, tries to spend one token, and returns (allowed, tokens_left)."""
+
+
+def _refill(tokens: float, elapsed: float, capacity: float, rate: float) -> Tuple[bool, float]:
+    tokens = min(capacity, tokens + max(elapsed, 0.0) * rate)
+    if tokens >= 1:
+        return True, tokens - 1
+    return False, tokens
+
+
+class MemoryBackend(RateLimitBackend):
+    """Per-process buckets. Fine for a single replica; each replica limits independently."""
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._calls = 0
+
+    async def take(self, key, capacity, rate):
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (capacity, now))
+        allowed, tokens = _refill(tokens, now - updated, capacity, rate)
+        self._buckets[key] = (tokens, now)
+
+        self._calls += 1
+        if self._calls % self.SWEEP_EVERY == 0:
+            self._sweep(now, capacity, rate)
+        return allowed, tokens
+
+    def _sweep(self, now, capacity, rate):
+        # Buckets that would be full again carry no state worth keeping
+        full_after = capacity / rate
+        self._buckets = {k: v for k, v in self._buckets.items() if now - v[1] < full_after}
+
+
+class PostgresBackend(RateLimitBackend):
+    """Buckets in the rate_limit_buckets table, shared by every API replica."""
+    async def take(self, key, capacity, rate):
+        Bucket = models.RateLimitBucket
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                pg_insert(Bucket)
+                .values(key=key, tokens=capacity)
+                .on_conflict_do_nothing(index_elements=[Bucket.key])
+            )
+            # Row lock serializes concurrent requests for the same client across replicas
+            bucket = (await db.execute(
+                select(Bucket).where(Bucket.key == key).with_for_update()
+            )).scalar_one()
+
+            now = datetime.now(timezone.utc)
+            allowed, tokens = _refill(bucket.tokens, (now - bucket.updated_at).total_seconds(), capacity, rate)
+            bucket.tokens = tokens
+            bucket.updated_at = now
+            await db.commit()
+        return allowed, tokens
+
+
+BACKENDS = {"memory": MemoryBackend, "postgres": PostgresBackend}
+
+
+class RateLimitConfigError(ValueError):
+    """Raised at startup when RATE_LIMIT_BACKEND names an unknown backend."""
+
+
+def make_backend(name: str) -> RateLimitBackend:
+    try:
+        return BACKENDS[name.strip().lower()]()
+    except KeyError:
+        raise RateLimitConfigError(
+            f"Unknown RATE_LIMIT_BACKEND {name!r}; expected one of: {', '.join(sorted(BACKENDS))}"
+        ) from None
+
+
+class RateLimiter:
+    def __init__(self, backend: RateLimitBackend, per_minute: int, burst: int):
+        self.backend = backend
+        self.capacity = float(burst)
+        self.rate = per_minute / 60.0
+
+    async def hit(self, key: str) -> RateLimitResult:
+        allowed, tokens = await self.backend.take(key, self.capacity, self.rate)
+        return RateLimitResult(
+            allowed=allowed,
+            limit=int(self.capacity),
+            remaining=int(tokens),
+            reset_seconds=int((self.capacity - tokens) / self.rate + 0.999),
+            retry_after=0 if allowed else int((1 - tokens) / self.rate + 0.999)
+        )
+
+
+predict_limiter = RateLimiter(
+    make_backend(settings.RATE_LIMIT_BACKEND),
+    per_minute=settings.PREDICT_RATE_LIMIT_PER_MINUTE,
+    burst=settings.PREDICT_RATE_LIMIT_BURST
+)
+
+
+def client_key(request: HTTPConnection, user) -> str:
+    """Limits apply per logged-in user, or per client IP for anonymous calls."""
+    if user is not None:
+        return f"user:{user.id}"
+    return f"ip:{request.client.host if request.client else 'unknown'}"
+
+
+async def check_prediction_limit(key: str) -> Optional[RateLimitResult]:
+    """Spends one prediction token for `key`. Returns None when rate limiting is disabled."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    return await predict_limiter.hit(f"predict:{key}")
+
+
+async def limit_predictions(request: Request, response: Response, current_user = Depends(get_optional_user)) -> str:
+    """
+    Dependency for inference routes: spends a token, sets the rate-limit headers,
+    and raises 429 when the bucket is empty. Returns the client key for fair scheduling.
+    """
+    key = client_key(request, current_user)
+    result = await check_prediction_limit(key)
+    if result is None:
+        return key
+
+    if not result.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many prediction requests. Slow down and try again shortly.",
+            headers=result.headers()
+        )
+    response.headers.update(result.headers())
+    return key
@@ -1,24 +1,45 @@
-import boto3
 import uuid
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Depends
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Form, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from config import settings
+import storage
+from storage import s3_client
+from thumbnails import store_variants
+from uploads import read_upload
+from chess_utils import position_keys
+from library_cache import bump_library_version, library_etag, not_modified_response, positions_response, position_response
+from routers.positions import find_saved_position
 from auth import get_current_user
 from sqlalchemy.ext.asyncio import AsyncSession
 import models
 from database import get_db
 from sqlalchemy.future import select
 from models import Position
-from schemas import PositionUpdate
+from schemas import PositionUpdate, UploadUrlRequest, UploadUrlResponse, UploadConfirm
 
 router = APIRouter()
 
-# Initialize the AWS S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-    region_name=settings.AWS_REGION
-)
+def _user_prefix(user: models.User) -> str:
+    return f"boards/{user.username}/"
+
+def _duplicate_response(existing: models.Position) -> dict:
+    return {
+        "message": "Board is already in your library",
+        "image_url": existing.image_path,
+        "id": existing.id,
+        "duplicate": True
+    }
+
+def _download(key: str) -> bytes:
+    return s3_client.get_object(Bucket=settings.AWS_BUCKET_NAME, Key=key)["Body"].read()
+
+async def _build_variants(key: str, data: bytes) -> dict:
+    """Thumbnails are best-effort: a bad image shouldn't block saving the board."""
+    try:
+        return await run_in_threadpool(store_variants, key, data)
+    except Exception as e:
+        print(f"Thumbnail Generation Error: {e}")
+        return {}
 
 @router.post("/upload")
 async def upload_image(
@@ -31,29 +52,35 @@ async def upload_image(
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image format.")
 
+    # Skip the S3 upload entirely if this position is already saved
+    existing = await find_saved_position(db, current_user.id, fen)
+    if existing:
+        return _duplicate_response(existing)
+
+    data = await read_upload(file)
+
     file_extension = file.filename.split(".")[-1]
-    unique_filename = f"boards/{current_user.username}/{uuid.uuid4()}.{file_extension}"
+    unique_filename = f"{_user_prefix(current_user)}{uuid.uuid4()}.{file_extension}"
 
     try:
         # Upload to S3
-        s3_client.upload_fileobj(
-            file.file,
-            settings.AWS_BUCKET_NAME,
-            unique_filename,
-            ExtraArgs={"ContentType": file.content_type}
-        )
-        
-        s3_url = f"https://{settings.AWS_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{unique_filename}"
+        s3_url = storage.upload_bytes(unique_filename, data, file.content_type)
+
+        # Store the compact thumbnail and normalized board next to the original
+        variants = await _build_variants(unique_filename, data)
 
         # Create the Database Record
         new_position = models.Position(
             user_id=current_user.id,
             fen=fen,
-            image_path=s3_url
+            image_path=s3_url,
+            **position_keys(fen),
+            **variants
         )
         
         # Save to Database
         db.add(new_position)
+        await bump_library_version(db, current_user.id)
         await db.commit()        
         await db.refresh(new_position) 
         
@@ -68,17 +95,130 @@ async def upload_image(
         await db.rollback() 
         raise HTTPException(status_code=500, detail="Failed to save board to cloud storage.")
     
+@router.post("/upload-url", response_model=UploadUrlResponse)
+async def create_upload_url(
+    upload: UploadUrlRequest,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Issues a presigned POST policy so the browser can upload the image straight to S3.
+    The policy is locked to one key under the user's folder, the given content type,
+    and MAX_UPLOAD_BYTES. Call /upload-confirm afterwards to save the position.
+    """
+    if not upload.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="File must be an image format.")
+
+    file_extension = upload.filename.split(".")[-1]
+    key = f"{_user_prefix(current_user)}{uuid.uuid4()}.{file_extension}"
+
+    try:
+        presigned = s3_client.generate_presigned_post(
+            Bucket=settings.AWS_BUCKET_NAME,
+            Key=key,
+            Fields={"Content-Type": upload.content_type},
+            Conditions=[
+                {"Content-Type": upload.content_type},
+                ["content-length-range", 1, settings.MAX_UPLOAD_BYTES],
+            ],
+            ExpiresIn=settings.PRESIGNED_URL_EXPIRE_SECONDS
+        )
+    except Exception as e:
+        print(f"AWS S3 Presign Error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to prepare cloud upload.")
+
+    return {
+        "url": presigned["url"],
+        "fields": presigned["fields"],
+        "key": key,
+        "expires_in": settings.PRESIGNED_URL_EXPIRE_SECONDS
+    }
+
+@router.post("/upload-confirm")
+async def confirm_upload(
+    upload: UploadConfirm,
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Saves a position for an image the client already uploaded via /upload-url."""
+    # 1. Only accept keys inside the caller's own folder
+    if not upload.key.startswith(_user_prefix(current_user)) or ".." in upload.key:
+        raise HTTPException(status_code=403, detail="Upload key does not belong to this user")
+
+    # 2. Each upload backs exactly one position: retries get the saved row back,
+    # and a different FEN can't share (and later delete) the same images
+    s3_url = storage.s3_url(upload.key)
+    claimed = (await db.execute(
+        select(Position).where(Position.user_id == current_user.id, Position.image_path == s3_url)
+    )).scalars().first()
+    if claimed:
+        if claimed.fen != upload.fen:
+            raise HTTPException(status_code=409, detail="This upload is already saved as a different position")
+        return _duplicate_response(claimed)
+
+    # 3. Make sure the object actually landed in S3
+    try:
+        s3_client.head_object(Bucket=settings.AWS_BUCKET_NAME, Key=upload.key)
+    except Exception as e:
+        print(f"AWS S3 Head Error: {e}")
+        raise HTTPException(status_code=404, detail="Uploaded image not found in cloud storage")
+
+    # 4. Already saved? Drop the redundant upload instead of storing a duplicate,
+    # unless it's the very object that position points to (a retried confirm)
+    existing = await find_saved_position(db, current_user.id, upload.fen)
+    if existing:
+        if existing.image_path != s3_url:
+            try:
+                s3_client.delete_object(Bucket=settings.AWS_BUCKET_NAME, Key=upload.key)
+            except Exception as e:
+                print(f"AWS S3 Deletion Error: {e}")
+        return _duplicate_response(existing)
+
+    # 5. Build thumbnails from the stored original (S3 -> API, not the slow client link)
+    try:
+        # Fetch and read the body in one worker thread; the read is the slow part
+        data = await run_in_threadpool(_download, upload.key)
+        variants = await _build_variants(upload.key, data)
+    except Exception as e:
+        print(f"AWS S3 Download Error: {e}")
+        variants = {}
+
+    # 6. Create the Database Record
+    new_position = models.Position(
+        user_id=current_user.id,
+        fen=upload.fen,
+        image_path=s3_url,
+        **position_keys(upload.fen),
+        **variants
+    )
+    db.add(new_position)
+    await bump_library_version(db, current_user.id)
+    await db.commit()
+    await db.refresh(new_position)
+
+    return {
+        "message": "Image successfully uploaded and saved to library",
+        "image_url": s3_url,
+        "id": new_position.id
+    }
+
 @router.get("/library")
 async def get_user_library(
+    request: Request,
     db: AsyncSession = Depends(get_db), 
     current_user = Depends(get_current_user)
 ):
+    # Unchanged since the client's copy? Answer 304 without touching the positions table
+    etag = library_etag(current_user, "library")
+    cached = not_modified_response(request, current_user, etag)
+    if cached:
+        return cached
+
     # Fetch all positions belonging to the logged-in user, newest first
     query = select(Position).where(Position.user_id == current_user.id).order_by(Position.created_at.desc())
     result = await db.execute(query)
     positions = result.scalars().all()
     
-    return positions
+    return positions_response(positions, current_user, etag)
 
 @router.delete("/library/{board_id}")
 async def delete_saved_board(
@@ -103,17 +243,19 @@ async def delete_saved_board(
     # URL looks like: https://bucket.s3.region.amazonaws.com/boards/user2/uuid.png
     # S3 just wants the key: boards/user2/uuid.png
     try:
-        s3_key = board.image_path.split(".amazonaws.com/")[-1]
-        s3_client.delete_object(
-            Bucket=settings.AWS_BUCKET_NAME,
-            Key=s3_key
-        )
+        for path in (board.image_path, board.thumbnail_path, board.board_image_path):
+            if path:
+                s3_client.delete_object(
+                    Bucket=settings.AWS_BUCKET_NAME,
+                    Key=storage.s3_key(path)
+                )
     except Exception as e:
         print(f"AWS S3 Deletion Error: {e}")
         # Delete from the DB even if S3 fails, so you don't get ghost records in your UI
         
     # 3. Delete from Postgres
     await db.delete(board)
+    await bump_library_version(db, current_user.id)
     await db.commit()
     
     return {"message": "Board successfully completely deleted"}
@@ -141,12 +283,15 @@ async def update_saved_board(
     # 2. Update only the fields the frontend actually sent
     if board_data.fen is not None:
         board.fen = board_data.fen
+        for key, value in position_keys(board.fen).items():
+            setattr(board, key, value)
     if board_data.category is not None:
         board.category = board_data.category
     if board_data.notes is not None:
         board.notes = board_data.notes
         
     # 3. Save the changes to the hard drive
+    await bump_library_version(db, current_user.id)
     await db.commit()
     await db.refresh(board)
     
@@ -156,10 +301,16 @@ async def update_saved_board(
 @router.get("/library/{board_id}")
 async def get_single_board(
     board_id: int,
+    request: Request,
     current_user: models.User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Fetches a single board's details for the edit page."""
+    etag = library_etag(current_user, "board", board_id)
+    cached = not_modified_response(request, current_user, etag)
+    if cached:
+        return cached
+
     query = select(models.Position).where(
         models.Position.id == board_id, 
         models.Position.user_id == current_user.id
@@ -170,4 +321,4 @@ async def get_single_board(
     if not board:
         raise HTTPException(status_code=404, detail="Board not found")
         
-    return board
\ No newline at end of file
+    return position_response(board, current_user, etag)
@@ -1,38 +1,159 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+import codecs
+import io
+from typing import AsyncIterator, List, Literal, Optional, Tuple
+import chess
+import chess.pgn
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, desc
+from sqlalchemy import select, desc, insert
 
 import models
 import schemas
 from auth import get_current_user
-from database import get_db
+import chess_utils
+from chess_utils import normalize_fen, position_keys
+from config import settings
+from library_cache import bump_library_version, library_etag, not_modified_response, positions_response
+from database import get_db, AsyncSessionLocal
 
 router = APIRouter()
 
+MAX_REPORTED_ERRORS = 100
+
+
+async def find_saved_position(db: AsyncSession, user_id: int, fen: str) -> Optional[models.Position]:
+    """Returns the user's existing position with the same piece placement, if any."""
+    query = select(models.Position).where(
+        models.Position.user_id == user_id,
+        models.Position.board_key == chess_utils.board_key(fen)
+    ).limit(1)
+    result = await db.execute(query)
+    return result.scalars().first()
+
+
+# ==========================================
+# BULK IMPORT PARSERS
+# ==========================================
+
+async def _iter_lines(request: Request) -> AsyncIterator[Tuple[int, str]]:
+    """Yields (line_number, line) from the request body without buffering it all."""
+    # Incremental decoder so multi-byte characters split across chunks survive
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    line_no = 0
+    async for chunk in request.stream():
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            yield line_no, line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield line_no + 1, buffer.rstrip("\r")
+
+def _parse_ndjson(line: str) -> dict:
+    position = schemas.PositionCreate.model_validate_json(line)
+    data = position.model_dump()
+    data["fen"] = normalize_fen(data["fen"])
+    return data
+
+def _parse_epd(line: str) -> dict:
+    board, ops = chess.Board.from_epd(line)
+    # c0 is the conventional EPD comment opcode, id the position name
+    notes = ops.get("c0") or ops.get("id")
+    return {"fen": board.fen(), "notes": str(notes) if notes is not None else None}
+
+def _parse_pgn(text: str) -> dict:
+    game = chess.pgn.read_game(io.StringIO(text))
+    if game is None:
+        raise ValueError("Empty PGN game")
+    if game.errors:
+        raise ValueError(str(game.errors[0]))
+    # Studies and puzzles carry the interesting position in a [FEN] header,
+    # full games are saved at their final position.
+    board = game.board() if "FEN" in game.headers else game.end().board()
+    headers = game.headers
+    notes = f"{headers.get('White', '?')} vs {headers.get('Black', '?')} ({headers.get('Event', '?')})"
+    return {"fen": board.fen(), "notes": notes}
+
+async def _iter_records(request: Request, fmt: str) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yields (line_number, row, error) for every record in the uploaded stream."""
+    if fmt == "pgn":
+        # A new game starts at a tag section that follows movetext or a blank line;
+        # [Event is optional, so don't rely on it. Parse the previous game when it does.
+        game_lines: List[str] = []
+        start_line = 1
+        seen_movetext = False
+        async for line_no, line in _iter_lines(request):
+            is_tag = line.startswith("[")
+            after_break = seen_movetext or (game_lines and not game_lines[-1].strip())
+            if is_tag and after_break and any(l.strip() for l in game_lines):
+                yield _safe_parse(_parse_pgn, "\n".join(game_lines), start_line)
+                game_lines, start_line, seen_movetext = [], line_no, False
+            if line.strip() and not is_tag:
+                seen_movetext = True
+            game_lines.append(line)
+        if any(l.strip() for l in game_lines):
+            yield _safe_parse(_parse_pgn, "\n".join(game_lines), start_line)
+        return
+
+    parser = _parse_ndjson if fmt == "ndjson" else _parse_epd
+    async for line_no, line in _iter_lines(request):
+        if line.strip():
+            yield _safe_parse(parser, line, line_no)
+
+def _safe_parse(parser, text: str, line_no: int) -> Tuple[int, Optional[dict], Optional[str]]:
+    try:
+        return line_no, parser(text), None
+    except ValidationError as e:
+        return line_no, None, e.errors()[0]["msg"]
+    except ValueError as e:
+        return line_no, None, str(e) or "Invalid position"
+
+
+# ==========================================
+# ROUTES
+# ==========================================
+
 @router.post("/", response_model=schemas.PositionResponse, status_code=status.HTTP_201_CREATED)
 async def create_position(
     position: schemas.PositionCreate, 
+    response: Response,
     current_user: models.User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
-    """Save a new chess position to the user's library."""
+    """Save a new chess position to the user's library (returns the existing one if already saved)."""
+    existing = await find_saved_position(db, current_user.id, position.fen)
+    if existing:
+        response.status_code = status.HTTP_200_OK
+        return existing
+
     new_position = models.Position(
         **position.model_dump(),
+        **position_keys(position.fen),
         user_id=current_user.id
     )
     db.add(new_position)
+    await bump_library_version(db, current_user.id)
     await db.commit()
     await db.refresh(new_position)
     return new_position
 
 @router.get("/", response_model=List[schemas.PositionResponse])
 async def get_positions(
+    request: Request,
     category: Optional[str] = Query(None, description="Filter by category (e.g., Endgames)"),
     current_user: models.User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Retrieve all saved positions for the logged-in user, newest first."""
+    etag = library_etag(current_user, "positions", category)
+    cached = not_modified_response(request, current_user, etag)
+    if cached:
+        return cached
+
     query = select(models.Position).where(models.Position.user_id == current_user.id)
     
     if category:
@@ -41,6 +162,45 @@ async def get_positions(
     # Order by newest first
     query = query.order_by(desc(models.Position.created_at))
     
+    result = await db.execute(query)
+    return positions_response(result.scalars().all(), current_user, etag)
+
+@router.get("/search", response_model=List[schemas.PositionResponse])
+async def search_positions(
+    board: Optional[str] = Query(None, description="FEN or piece placement to look up"),
+    prefix: bool = Query(False, description="Match board as a piece-placement prefix (from rank 8 down)"),
+    material: Optional[str] = Query(None, description="Material signature, e.g. KRPvKR"),
+    limit: int = Query(100, ge=1, le=1000),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Find positions in the user's library by piece placement or material.
+    Every filter hits the (user_id, board_key) / (user_id, material_key) indexes.
+    """
+    if not board and not material:
+        raise HTTPException(status_code=400, detail="Provide a board and/or material filter")
+
+    query = select(models.Position).where(models.Position.user_id == current_user.id)
+
+    if board:
+        placement = board.strip().split(" ")[0]
+        if prefix:
+            if not placement or any(c not in "pnbrqkPNBRQK12345678/" for c in placement):
+                raise HTTPException(status_code=400, detail="Invalid piece-placement prefix")
+            # Plain 'prefix%' pattern (validated above, so no wildcards) keeps it index-backed
+            query = query.where(models.Position.board_key.like(f"{placement}%"))
+        else:
+            query = query.where(models.Position.board_key == chess_utils.board_key(board))
+
+    if material:
+        try:
+            signature = chess_utils.normalize_material(material)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        query = query.where(models.Position.material_key == signature)
+
+    query = query.order_by(desc(models.Position.created_at)).limit(limit)
     result = await db.execute(query)
     return result.scalars().all()
 
@@ -70,6 +230,12 @@ async def update_position(
     for key, value in update_dict.items():
         setattr(position, key, value)
 
+    # 4. Keep the search keys in sync with the FEN
+    if update_dict.get("fen"):
+        for key, value in position_keys(position.fen).items():
+            setattr(position, key, value)
+
+    await bump_library_version(db, current_user.id)
     await db.commit()
     await db.refresh(position)
     return position
@@ -92,5 +258,106 @@ async def delete_position(
         raise HTTPException(status_code=404, detail="Position not found")
         
     await db.delete(position)
+    await bump_library_version(db, current_user.id)
     await db.commit()
-    return None
\ No newline at end of file
+    return None
+
+@router.post("/import", response_model=schemas.BulkImportResult)
+async def import_positions(
+    request: Request,
+    format: Literal["ndjson", "epd", "pgn"] = Query("ndjson", description="Body format: NDJSON, EPD lines, or PGN games"),
+    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Bulk-import positions from a streamed request body.
+    Every FEN is validated with python-chess; valid rows are inserted with one
+    executemany per chunk of BULK_CHUNK_SIZE, each chunk in its own transaction.
+    """
+    # Read once: a rollback after a failed chunk expires current_user
+    user_id = current_user.id
+    imported = 0
+    failed = 0
+    errors: List[dict] = []
+    chunk: List[Tuple[int, dict]] = []
+
+    def record_error(line_no: int, message: str):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_no, "error": message})
+
+    async def flush():
+        nonlocal imported
+        if not chunk:
+            return
+        try:
+            await db.execute(
+                insert(models.Position),
+                [{**row, **position_keys(row["fen"]), "user_id": user_id} for _, row in chunk]
+            )
+            await bump_library_version(db, user_id)
+            await db.commit()
+            imported += len(chunk)
+        except Exception as e:
+            print(f"Bulk Import Database Error: {e}")
+            await db.rollback()
+            for line_no, _ in chunk:
+                record_error(line_no, "Database rejected this chunk")
+        chunk.clear()
+
+    try:
+        async for line_no, row, error in _iter_records(request, format):
+            if error:
+                record_error(line_no, error)
+                continue
+            chunk.append((line_no, row))
+            if len(chunk) >= settings.BULK_CHUNK_SIZE:
+                await flush()
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be UTF-8 text")
+
+    await flush()
+
+    return {"imported": imported, "failed": failed, "errors": errors}
+
+@router.get("/export")
+async def export_positions(
+    format: Literal["ndjson", "epd"] = Query("ndjson", description="NDJSON rows or EPD lines"),
+    category: Optional[str] = Query(None, description="Filter by category (e.g., Endgames)"),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Stream the user's positions using a server-side cursor instead of loading them all."""
+    user_id = current_user.id
+
+    query = select(models.Position).where(models.Position.user_id == user_id)
+    if category:
+        query = query.where(models.Position.category == category)
+    query = query.order_by(models.Position.id).execution_options(yield_per=settings.BULK_CHUNK_SIZE)
+
+    def to_line(position: models.Position) -> str:
+        if format == "ndjson":
+            return schemas.PositionResponse.model_validate(position).model_dump_json() + "\n"
+        try:
+            ops = {"id": str(position.id)}
+            if position.notes:
+                ops["c0"] = position.notes
+            return chess.Board(position.fen).epd(**ops) + "\n"
+        except ValueError:
+            # Older rows were saved without validation; keep the first four FEN fields
+            return " ".join(position.fen.split()[:4]) + f' id "{position.id}";\n'
+
+    async def generate():
+        # Own session: the request-scoped one may be closed before streaming finishes
+        async with AsyncSessionLocal() as db:
+            result = await db.stream(query)
+            async for position in result.scalars():
+                yield to_line(position)
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/plain"
+    filename = f"chesslens-positions.{'ndjson' if format == 'ndjson' else 'epd'}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
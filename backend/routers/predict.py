@@ -1,39 +1,112 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Request
-import shutil
-import os
+from fastapi import APIRouter, UploadFile, File, HTTPException, Request, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+import asyncio
+import io
+
+import jobs
+import models
+import schemas
+from auth import get_optional_user
+from config import settings
+from database import get_db
+from ml.scheduler import QueueFullError
+from rate_limit import client_key, limit_predictions
+from uploads import read_upload
 
 
 router = APIRouter()
 
+ALLOWED_TYPES = ["image/jpeg", "image/png"]
+
+def _lichess_url(fen: str) -> str:
+    return f"https://lichess.org/editor/{fen.replace(' ', '_')}"
+
+def _job_response(job: models.PredictionJob) -> dict:
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "fen": job.fen,
+        "lichess_url": _lichess_url(job.fen) if job.fen else None,
+        "error": job.error if job.status == "failed" else None,
+        "attempts": job.attempts,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at
+    }
+
 @router.post("/predict")
-async def predict_fen(request: Request, file: UploadFile = File(...)):
+async def predict_fen(
+    request: Request,
+    file: UploadFile = File(...),
+    client: str = Depends(limit_predictions)
+):
     # 1. Grab the model from the app state backpack
     model = getattr(request.app.state, "piece_classifier", None)
+    scheduler = getattr(request.app.state, "inference_scheduler", None)
     
-    if model is None:
+    if model is None or scheduler is None:
         raise HTTPException(status_code=503, detail="AI Model is not ready yet.")
 
     # 2. Validate file type
-    if file.content_type not in ["image/jpeg", "image/png"]:
+    if file.content_type not in ALLOWED_TYPES:
         raise HTTPException(status_code=400, detail="Invalid file type. Only JPEG/PNG allowed.")
 
+    image = io.BytesIO(await read_upload(file))
+
     try:
-        temp_filename = f"temp_{file.filename}"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # 3. Run Inference
-        real_fen = model.predict(temp_filename)
-        
-        # 4. Cleanup
-        os.remove(temp_filename)
+        # 3. Run Inference, taking turns fairly with other users' requests
+        real_fen = await scheduler.submit(client, model.predict, image)
         
         return {
             "fen": real_fen,
-            "lichess_url": f"https://lichess.org/editor/{real_fen.replace(' ', '_')}"
+            "lichess_url": _lichess_url(real_fen)
         }
 
+    except QueueFullError:
+        raise HTTPException(status_code=429, detail="You already have predictions waiting. Try again shortly.")
     except Exception as e:
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+@router.post("/predict/jobs", response_model=schemas.PredictionJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def submit_prediction_job(
+    file: UploadFile = File(...),
+    owner_key: str = Depends(limit_predictions),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Queue an image for prediction and return a job id straight away.
+    A separate worker process (worker.py) runs the model; poll GET /predict/jobs/{job_id}.
+    """
+    if file.content_type not in ALLOWED_TYPES:
+        raise HTTPException(status_code=400, detail="Invalid file type. Only JPEG/PNG allowed.")
+    image = await read_upload(file)
+
+    # Per-user cap on queued + running jobs
+    if await jobs.count_active_jobs(db, owner_key) >= settings.JOB_MAX_ACTIVE_PER_USER:
+        raise HTTPException(status_code=429, detail="Too many prediction jobs in progress. Try again shortly.")
+
+    job = await jobs.enqueue_job(db, owner_key, image)
+    return _job_response(job)
+
+@router.get("/predict/jobs/{job_id}", response_model=schemas.PredictionJobResponse)
+async def get_prediction_job(
+    job_id: str,
+    request: Request,
+    wait: int = Query(0, ge=0, description="Long-poll: seconds to wait for the job to finish"),
+    current_user = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Fetch a job's status. With ?wait=N, holds the request until the job finishes or N seconds pass."""
+    owner_key = client_key(request, current_user)
+    deadline = asyncio.get_running_loop().time() + min(wait, settings.JOB_LONG_POLL_MAX_SECONDS)
+
+    while True:
+        job = await db.get(models.PredictionJob, job_id, populate_existing=True)
+        if not job or job.owner_key != owner_key:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        if job.status in ("done", "failed") or asyncio.get_running_loop().time() >= deadline:
+            return _job_response(job)
+
+        # End the read transaction so the next poll sees the worker's commit
+        await db.rollback()
+        await asyncio.sleep(settings.JOB_WORKER_POLL_SECONDS)
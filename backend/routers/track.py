@@ -0,0 +1,253 @@
+import json
+import os
+import tempfile
+from typing import Optional, Tuple
+
+import anyio
+import cv2
+import numpy as np
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+
+from auth import get_current_user
+from config import settings
+from database import AsyncSessionLocal
+from ml.scheduler import QueueFullError
+from ml.tracker import BoardTracker
+from rate_limit import check_prediction_limit, client_key, limit_predictions
+
+router = APIRouter()
+
+
+BOX_ERROR = "box must be 'x,y,width,height' with non-negative x, y and positive width, height"
+
+
+def _parse_box(box) -> Optional[Tuple[int, int, int, int]]:
+    """"x,y,w,h" (query string) or [x, y, w, h] (WebSocket config) -> tuple. Raises ValueError."""
+    if box is None or box == "":
+        return None
+
+    if isinstance(box, str):
+        try:
+            values = [int(v) for v in box.split(",")]
+        except ValueError:
+            raise ValueError(BOX_ERROR)
+    elif isinstance(box, list) and all(isinstance(v, int) and not isinstance(v, bool) for v in box):
+        values = box
+    else:
+        raise ValueError(BOX_ERROR)
+
+    if len(values) != 4:
+        raise ValueError(BOX_ERROR)
+    x, y, w, h = values
+    if w <= 0 or h <= 0 or x < 0 or y < 0:
+        raise ValueError(BOX_ERROR)
+    return (x, y, w, h)
+
+
+def _parse_threshold(threshold) -> Optional[float]:
+    """Per-square change threshold: a positive number, or None for the default. Raises ValueError."""
+    if threshold is None:
+        return None
+    if isinstance(threshold, bool) or not isinstance(threshold, (int, float)) or not threshold > 0:
+        raise ValueError("threshold must be a positive number")
+    return float(threshold)
+
+
+def _scheduled_classify(scheduler, client: str, model):
+    """
+    Square classifier for BoardTracker that queues each batch on the shared
+    FairScheduler under the client's key. The tracker runs in a worker thread,
+    so hop back to the event loop to submit.
+    """
+    def classify(squares: np.ndarray) -> np.ndarray:
+        return anyio.from_thread.run(scheduler.submit, client, model.classify_squares, squares)
+    return classify
+
+
+def _make_tracker(model, scheduler, client: str, box, threshold: Optional[float]) -> BoardTracker:
+    return BoardTracker(
+        model,
+        board_box=box,
+        change_threshold=threshold if threshold is not None else settings.TRACK_CHANGE_THRESHOLD,
+        stable_frames=settings.TRACK_STABLE_FRAMES,
+        classify=_scheduled_classify(scheduler, client, model)
+    )
+
+
+def _track_video(tracker: BoardTracker, path: str, sample_fps: Optional[float]):
+    """Runs in a worker thread: decode the video and collect tracker events."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError("Could not decode video")
+
+    video_fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    step = max(1, round(video_fps / sample_fps)) if sample_fps else 1
+
+    events = []
+    frame_index = 0
+    try:
+        while True:
+            ok = capture.grab()
+            if not ok:
+                break
+            if frame_index % step == 0:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    break
+                event = tracker.process_frame(frame, timestamp=round(frame_index / video_fps, 3))
+                if event:
+                    events.append(event)
+            frame_index += 1
+    finally:
+        capture.release()
+
+    return events, frame_index, video_fps
+
+
+@router.post("/track/video")
+async def track_video(
+    request: Request,
+    file: UploadFile = File(...),
+    box: Optional[str] = Query(None, description="Board region in each frame as 'x,y,width,height'"),
+    sample_fps: Optional[float] = Query(None, gt=0, description="Analyse at most this many frames per second"),
+    threshold: Optional[float] = Query(None, gt=0, description="Per-square pixel change needed to re-classify"),
+    client: str = Depends(limit_predictions),
+):
+    """Extracts the sequence of positions and moves from a recorded game video."""
+    model = getattr(request.app.state, "piece_classifier", None)
+    scheduler = getattr(request.app.state, "inference_scheduler", None)
+    if model is None or scheduler is None:
+        raise HTTPException(status_code=503, detail="AI Model is not ready yet.")
+    if not file.content_type.startswith("video/"):
+        raise HTTPException(status_code=400, detail="File must be a video format.")
+
+    try:
+        board_box = _parse_box(box)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    tracker = _make_tracker(model, scheduler, client, board_box, threshold)
+
+    # OpenCV needs a real file to decode from
+    suffix = os.path.splitext(file.filename or "")[1] or ".mp4"
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        temp_filename = tmp.name
+        size = 0
+        while chunk := await file.read(1024 * 1024):
+            size += len(chunk)
+            if size > settings.TRACK_MAX_VIDEO_BYTES:
+                break
+            tmp.write(chunk)
+
+    try:
+        if size > settings.TRACK_MAX_VIDEO_BYTES:
+            raise HTTPException(status_code=413, detail="Video is too large.")
+        events, frames, video_fps = await run_in_threadpool(_track_video, tracker, temp_filename, sample_fps)
+    except QueueFullError:
+        raise HTTPException(status_code=429, detail="Too many predictions queued. Try again shortly.")
+    except ValueError as e:
+        # Undecodable video, or a box that doesn't fit the frames
+        raise HTTPException(status_code=400, detail=str(e))
+    except cv2.error as e:
+        raise HTTPException(status_code=400, detail=f"Could not process video frames: {e.msg}")
+    finally:
+        os.remove(temp_filename)
+
+    return {
+        "events": events,
+        "frames": frames,
+        "fps": video_fps,
+        "frames_processed": tracker.frames_processed,
+        "squares_classified": tracker.squares_classified
+    }
+
+
+@router.websocket("/track/ws")
+async def track_stream(websocket: WebSocket):
+    """
+    Live tracking. Send each frame as a binary JPEG/PNG message; the server replies
+    with a JSON event only when the position changes. An optional first text
+    message can configure the stream: {"box": [x, y, w, h], "threshold": 12}.
+    Logged-in clients pass their access token as the `token` query parameter so
+    the stream counts against their own rate limit instead of their IP's.
+    """
+    await websocket.accept()
+
+    model = getattr(websocket.app.state, "piece_classifier", None)
+    scheduler = getattr(websocket.app.state, "inference_scheduler", None)
+    if model is None or scheduler is None:
+        await websocket.send_json({"type": "error", "detail": "AI Model is not ready yet."})
+        await websocket.close(code=1011)
+        return
+
+    user = None
+    token = websocket.query_params.get("token")
+    if token:
+        try:
+            async with AsyncSessionLocal() as db:
+                user = await get_current_user(token=token, db=db)
+        except HTTPException as e:
+            await websocket.send_json({"type": "error", "detail": e.detail})
+            await websocket.close(code=1008)
+            return
+
+    # Opening a stream spends one prediction token
+    client = client_key(websocket, user)
+    limit = await check_prediction_limit(client)
+    if limit is not None and not limit.allowed:
+        await websocket.send_json({
+            "type": "error",
+            "detail": "Too many prediction requests. Slow down and try again shortly.",
+            "retry_after": limit.retry_after
+        })
+        await websocket.close(code=1008)
+        return
+
+    tracker = _make_tracker(model, scheduler, client, None, None)
+    frame_index = 0
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("text") is not None:
+                try:
+                    config = json.loads(message["text"])
+                    if not isinstance(config, dict):
+                        raise ValueError("Config must be a JSON object")
+                    tracker = _make_tracker(
+                        model, scheduler, client, _parse_box(config.get("box")), _parse_threshold(config.get("threshold"))
+                    )
+                    await websocket.send_json({"type": "configured"})
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": f"Invalid config message: {e}"})
+                continue
+
+            data = message.get("bytes")
+            if not data:
+                continue
+
+            frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            if frame is None:
+                await websocket.send_json({"type": "error", "detail": "Could not decode frame", "frame": frame_index})
+                frame_index += 1
+                continue
+
+            try:
+                event = await run_in_threadpool(tracker.process_frame, frame, None)
+            except QueueFullError:
+                await websocket.send_json({"type": "error", "detail": "Too many predictions queued", "frame": frame_index})
+                frame_index += 1
+                continue
+            except (ValueError, cv2.error) as e:
+                # e.g. the configured box doesn't fit this frame; keep the stream alive
+                await websocket.send_json({"type": "error", "detail": str(e), "frame": frame_index})
+                frame_index += 1
+                continue
+            if event:
+                await websocket.send_json({**event, "frame": frame_index})
+            frame_index += 1
+    except WebSocketDisconnect:
+        pass
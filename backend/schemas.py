@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
-from typing import Optional, List
+from pydantic import BaseModel, EmailStr, ConfigDict, Field
+from typing import Optional, List, Dict
 from datetime import datetime
 
 # ==========================================
@@ -13,25 +13,73 @@ class PositionBase(BaseModel):
     image_path: Optional[str] = None
 
 class PositionCreate(PositionBase):
-    """Schema for receiving data to create a new position."""
-    pass
+    """Schema for receiving data to create a new position. Lengths match the columns."""
+    fen: str = Field(max_length=100)
+    category: Optional[str] = Field(None, max_length=50)
+    image_path: Optional[str] = Field(None, max_length=255)
 
 class PositionUpdate(BaseModel):
     """Schema for updating an existing position. All fields optional."""
-    fen: Optional[str] = None
-    category: Optional[str] = None
+    fen: Optional[str] = Field(None, max_length=100)
+    category: Optional[str] = Field(None, max_length=50)
     notes: Optional[str] = None
 
+class UploadUrlRequest(BaseModel):
+    """Schema for requesting a presigned direct-to-S3 upload."""
+    filename: str
+    content_type: str
+
+class UploadUrlResponse(BaseModel):
+    """Presigned POST policy the browser uses to upload straight to S3."""
+    url: str
+    fields: Dict[str, str]
+    key: str
+    expires_in: int
+
+class UploadConfirm(BaseModel):
+    """Schema for confirming a finished direct upload and saving the position."""
+    key: str
+    fen: str
+
 class PositionResponse(PositionBase):
     """Schema for returning position data to the frontend."""
     id: int
     user_id: int
+    thumbnail_path: Optional[str] = None
+    board_image_path: Optional[str] = None
     created_at: datetime
 
     # This tells Pydantic to read data even if it's an ORM model, not just a dict
     model_config = ConfigDict(from_attributes=True)
 
 
+class BulkImportError(BaseModel):
+    line: int
+    error: str
+
+class BulkImportResult(BaseModel):
+    """Summary returned after a bulk import finishes."""
+    imported: int
+    failed: int
+    errors: List[BulkImportError]
+
+
+# ==========================================
+# PREDICTION JOB SCHEMAS
+# ==========================================
+
+class PredictionJobResponse(BaseModel):
+    """Schema for returning the state of an async prediction job."""
+    job_id: str
+    status: str
+    fen: Optional[str] = None
+    lichess_url: Optional[str] = None
+    error: Optional[str] = None
+    attempts: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+
 # ==========================================
 # USER SCHEMAS
 # ==========================================
@@ -0,0 +1,89 @@
+"""
+Offline job: generate library thumbnails for boards uploaded before they existed.
+
+Run from the backend directory:
+    python -m scripts.backfill_thumbnails --workers 4 --batch-size 100
+"""
+import argparse
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from sqlalchemy import select
+
+import models
+from config import settings
+from database import AsyncSessionLocal
+from library_cache import bump_library_version
+from storage import s3_client, s3_key
+from thumbnails import store_variants
+
+
+def process_board(position_id: int, image_path: str):
+    """Runs in a worker process: download the original, build and upload its variants."""
+    try:
+        key = s3_key(image_path)
+        data = s3_client.get_object(Bucket=settings.AWS_BUCKET_NAME, Key=key)["Body"].read()
+        return position_id, store_variants(key, data)
+    except Exception as e:
+        print(f"⚠️ Board {position_id} failed: {e}")
+        return position_id, None
+
+
+async def backfill(workers: int, batch_size: int):
+    loop = asyncio.get_running_loop()
+    last_id = 0
+    done = failed = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            async with AsyncSessionLocal() as db:
+                # Keyset pagination so failed rows don't get picked up again forever
+                query = (
+                    select(models.Position)
+                    .where(
+                        models.Position.id > last_id,
+                        models.Position.image_path.isnot(None),
+                        models.Position.thumbnail_path.is_(None)
+                    )
+                    .order_by(models.Position.id)
+                    .limit(batch_size)
+                )
+                boards = (await db.execute(query)).scalars().all()
+                if not boards:
+                    break
+                last_id = boards[-1].id
+
+                jobs = [
+                    loop.run_in_executor(pool, process_board, board.id, board.image_path)
+                    for board in boards
+                ]
+                results = dict(await asyncio.gather(*jobs))
+
+                updated_users = set()
+                for board in boards:
+                    variants = results.get(board.id)
+                    if not variants:
+                        failed += 1
+                        continue
+                    for field, value in variants.items():
+                        setattr(board, field, value)
+                    updated_users.add(board.user_id)
+                    done += 1
+
+                # Invalidate cached library ETags so clients pick up the new thumbnails
+                for user_id in updated_users:
+                    await bump_library_version(db, user_id)
+                await db.commit()
+                print(f"🖼️ Processed up to board {last_id} ({done} done, {failed} failed)")
+
+    print(f"✅ Backfill finished: {done} boards updated, {failed} failed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill library thumbnails.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=100)
+    args = parser.parse_args()
+
+    asyncio.run(backfill(args.workers, args.batch_size))
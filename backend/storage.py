@@ -0,0 +1,38 @@
+import boto3
+from config import settings
+
+# Initialize the AWS S3 client
+s3_client = boto3.client(
+    's3',
+    aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+    aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+    region_name=settings.AWS_REGION,
+    endpoint_url=settings.AWS_ENDPOINT_URL or None
+)
+
+def s3_url(key: str) -> str:
+    """Public URL for an object key (honours a local S3 stand-in endpoint)."""
+    if settings.AWS_ENDPOINT_URL:
+        return f"{settings.AWS_ENDPOINT_URL.rstrip('/')}/{settings.AWS_BUCKET_NAME}/{key}"
+    return f"https://{settings.AWS_BUCKET_NAME}.s3.{settings.AWS_REGION}.amazonaws.com/{key}"
+
+def s3_key(url: str) -> str:
+    """Inverse of s3_url: strip the bucket URL prefix to get the object key."""
+    if settings.AWS_ENDPOINT_URL:
+        return url.split(f"/{settings.AWS_BUCKET_NAME}/", 1)[-1]
+    return url.split(".amazonaws.com/")[-1]
+
+def variant_key(key: str, suffix: str, extension: str) -> str:
+    """boards/user/uuid.png -> boards/user/uuid_thumb.webp"""
+    stem = key.rsplit(".", 1)[0]
+    return f"{stem}_{suffix}.{extension}"
+
+def upload_bytes(key: str, data: bytes, content_type: str) -> str:
+    """Uploads raw bytes to the bucket and returns the public URL."""
+    s3_client.put_object(
+        Bucket=settings.AWS_BUCKET_NAME,
+        Key=key,
+        Body=data,
+        ContentType=content_type
+    )
+    return s3_url(key)
@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point everything at local stand-ins first
+_db_dir = tempfile.mkdtemp(prefix="chesslens-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("DATABASE_ECHO", "false")
+os.environ["AWS_ACCESS_KEY_ID"] = "testing"
+os.environ["AWS_SECRET_ACCESS_KEY"] = "testing"
+os.environ["AWS_REGION"] = "us-east-1"
+os.environ["AWS_BUCKET_NAME"] = "chesslens-test"
+os.environ["AWS_ENDPOINT_URL"] = ""
+
+from contextlib import asynccontextmanager
+
+import boto3
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from moto import mock_aws
+from sqlalchemy import select
+
+import models
+import storage
+from auth import get_current_user
+from config import settings
+from database import Base, engine, get_db
+from routers import fen, positions
+
+
+@asynccontextmanager
+async def _lifespan(app):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await engine.dispose()
+
+
+async def _current_test_user(db=Depends(get_db)):
+    """Stands in for JWT auth: every request is made as 'alice'."""
+    user = (await db.execute(select(models.User).where(models.User.username == "alice"))).scalars().first()
+    if user is None:
+        user = models.User(username="alice", email="alice@example.com", hashed_password="x")
+        db.add(user)
+        await db.commit()
+        await db.refresh(user)
+    return user
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """moto-backed S3 with the app's bucket created and the app's client swapped in."""
+    with mock_aws():
+        client = boto3.client("s3", region_name=settings.AWS_REGION)
+        client.create_bucket(Bucket=settings.AWS_BUCKET_NAME)
+        monkeypatch.setattr(storage, "s3_client", client)
+        monkeypatch.setattr(fen, "s3_client", client)
+        yield client
+
+
+@pytest.fixture
+def client(s3):
+    app = FastAPI(lifespan=_lifespan)
+    app.include_router(fen.router, prefix="/api/fen")
+    app.include_router(positions.router, prefix="/api/positions")
+    app.dependency_overrides[get_current_user] = _current_test_user
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def db_rows(client):
+    """Runs a SELECT on the test client's event loop and returns the result rows."""
+    def fetch(query):
+        async def run():
+            async with engine.connect() as conn:
+                return (await conn.execute(query)).all()
+        return client.portal.call(run)
+    return fetch
@@ -0,0 +1,128 @@
+import base64
+import io
+import json
+
+from PIL import Image
+from sqlalchemy import select
+
+import models
+from config import settings
+
+FEN = "8/8/8/4k3/8/8/8/4K3 w - - 0 1"
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (181, 136, 99)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def _request_upload(client, content_type="image/png"):
+    return client.post("/api/fen/upload-url", json={"filename": "board.png", "content_type": content_type})
+
+
+def test_upload_url_is_scoped_to_user_folder(client):
+    response = _request_upload(client)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["key"].startswith("boards/alice/")
+    assert body["key"].endswith(".png")
+    assert body["fields"]["key"] == body["key"]
+    assert body["fields"]["Content-Type"] == "image/png"
+    assert body["expires_in"] == settings.PRESIGNED_URL_EXPIRE_SECONDS
+
+
+def test_upload_url_policy_restricts_content_type_and_size(client):
+    fields = _request_upload(client).json()["fields"]
+    policy = json.loads(base64.b64decode(fields["policy"]))
+
+    assert {"Content-Type": "image/png"} in policy["conditions"]
+    assert ["content-length-range", 1, settings.MAX_UPLOAD_BYTES] in policy["conditions"]
+
+
+def test_upload_url_rejects_non_images(client):
+    response = _request_upload(client, content_type="application/pdf")
+
+    assert response.status_code == 400
+
+
+def test_confirm_rejects_another_users_key(client, s3):
+    s3.put_object(Bucket=settings.AWS_BUCKET_NAME, Key="boards/bob/board.png", Body=_png_bytes())
+
+    response = client.post("/api/fen/upload-confirm", json={"key": "boards/bob/board.png", "fen": FEN})
+
+    assert response.status_code == 403
+
+
+def test_confirm_rejects_path_traversal(client):
+    response = client.post("/api/fen/upload-confirm", json={"key": "boards/alice/../bob/board.png", "fen": FEN})
+
+    assert response.status_code == 403
+
+
+def test_confirm_missing_object_returns_404(client):
+    key = _request_upload(client).json()["key"]
+
+    response = client.post("/api/fen/upload-confirm", json={"key": key, "fen": FEN})
+
+    assert response.status_code == 404
+
+
+def test_confirm_creates_position(client, s3, db_rows):
+    key = _request_upload(client).json()["key"]
+    s3.put_object(Bucket=settings.AWS_BUCKET_NAME, Key=key, Body=_png_bytes(), ContentType="image/png")
+
+    response = client.post("/api/fen/upload-confirm", json={"key": key, "fen": FEN})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["image_url"].endswith(key)
+
+    rows = db_rows(select(models.Position).where(models.Position.id == body["id"]))
+    assert len(rows) == 1
+    position = rows[0]
+    assert position.fen == FEN
+    assert position.image_path == body["image_url"]
+    assert position.board_key == "8/8/8/4k3/8/8/8/4K3"
+    assert position.thumbnail_path is not None
+
+
+def test_retried_confirm_keeps_original_image(client, s3):
+    key = _request_upload(client).json()["key"]
+    s3.put_object(Bucket=settings.AWS_BUCKET_NAME, Key=key, Body=_png_bytes(), ContentType="image/png")
+
+    first = client.post("/api/fen/upload-confirm", json={"key": key, "fen": FEN})
+    second = client.post("/api/fen/upload-confirm", json={"key": key, "fen": FEN})
+
+    assert first.status_code == second.status_code == 200
+    assert second.json()["id"] == first.json()["id"]
+    assert second.json()["duplicate"] is True
+    s3.head_object(Bucket=settings.AWS_BUCKET_NAME, Key=key)
+
+
+def test_confirm_duplicate_fen_drops_new_upload(client, s3):
+    first_key = _request_upload(client).json()["key"]
+    second_key = _request_upload(client).json()["key"]
+    for key in (first_key, second_key):
+        s3.put_object(Bucket=settings.AWS_BUCKET_NAME, Key=key, Body=_png_bytes(), ContentType="image/png")
+
+    client.post("/api/fen/upload-confirm", json={"key": first_key, "fen": FEN})
+    response = client.post("/api/fen/upload-confirm", json={"key": second_key, "fen": FEN})
+
+    assert response.json()["duplicate"] is True
+    keys = {o["Key"] for o in s3.list_objects_v2(Bucket=settings.AWS_BUCKET_NAME)["Contents"]}
+    assert first_key in keys
+    assert second_key not in keys
+
+
+def test_confirm_rejects_key_already_saved_as_other_fen(client, s3, db_rows):
+    key = _request_upload(client).json()["key"]
+    s3.put_object(Bucket=settings.AWS_BUCKET_NAME, Key=key, Body=_png_bytes(), ContentType="image/png")
+
+    first = client.post("/api/fen/upload-confirm", json={"key": key, "fen": FEN})
+    second = client.post("/api/fen/upload-confirm", json={"key": key, "fen": "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"})
+
+    assert first.status_code == 200
+    assert second.status_code == 409
+    assert len(db_rows(select(models.Position))) == 1
@@ -0,0 +1,69 @@
+import json
+
+from sqlalchemy import select
+
+import models
+from config import settings
+from routers import positions
+
+FEN = "8/8/8/4k3/8/8/8/4K3 w - - 0 1"
+
+
+def _import(client, body: str, fmt: str = "ndjson"):
+    return client.post("/api/positions/import", params={"format": fmt}, content=body.encode())
+
+
+def test_ndjson_rejects_overlong_fields_per_row(client, db_rows):
+    rows = [
+        {"fen": FEN, "category": "Endgames"},
+        {"fen": FEN, "category": "x" * 51},
+        {"fen": FEN, "image_path": "x" * 256},
+        {"fen": FEN, "notes": "y" * 1000},
+    ]
+    response = _import(client, "\n".join(json.dumps(r) for r in rows))
+
+    body = response.json()
+    assert body["imported"] == 2
+    assert body["failed"] == 2
+    assert [e["line"] for e in body["errors"]] == [2, 3]
+    assert len(db_rows(select(models.Position))) == 2
+
+
+def test_pgn_without_event_tags_imports_every_game(client):
+    pgn = (
+        '[White "A"]\n[Black "B"]\n\n1. e4 e5 *\n\n'
+        '[White "C"]\n[Black "D"]\n\n1. d4 d5 *\n\n'
+        '[FEN "8/8/8/4k3/8/8/8/4K3 w - - 0 1"]\n\n*\n'
+    )
+    body = _import(client, pgn, fmt="pgn").json()
+
+    assert body["imported"] == 3
+    assert body["failed"] == 0
+
+
+def test_pgn_with_event_tags_splits_games(client):
+    pgn = '[Event "One"]\n\n1. e4 *\n[Event "Two"]\n\n1. d4 *\n'
+    body = _import(client, pgn, fmt="pgn").json()
+
+    assert body["imported"] == 2
+
+
+def test_failed_chunk_does_not_stop_later_chunks(client, monkeypatch):
+    monkeypatch.setattr(settings, "BULK_CHUNK_SIZE", 2)
+    real_bump = positions.bump_library_version
+    calls = []
+
+    async def flaky_bump(db, user_id):
+        calls.append(user_id)
+        if len(calls) == 1:
+            raise RuntimeError("simulated database failure")
+        await real_bump(db, user_id)
+
+    monkeypatch.setattr(positions, "bump_library_version", flaky_bump)
+
+    body = _import(client, "\n".join(json.dumps({"fen": FEN}) for _ in range(5))).json()
+
+    # The first chunk rolls back; the rollback expires the user, which later chunks must not touch
+    assert body["imported"] == 3
+    assert [e["line"] for e in body["errors"]] == [1, 2]
+    assert {e["error"] for e in body["errors"]} == {"Database rejected this chunk"}
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+import jobs
+import models
+from database import AsyncSessionLocal, Base, engine
+
+
+def _run(scenario):
+    """Runs `scenario(db)` against a fresh schema on its own event loop."""
+    async def main():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        try:
+            async with AsyncSessionLocal() as db:
+                return await scenario(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+async def _running_job(db, attempts=1, status="running") -> str:
+    job = models.PredictionJob(owner_key="ip:test", status=status, image=b"img", attempts=attempts, max_attempts=3)
+    db.add(job)
+    await db.commit()
+    return job.id
+
+
+async def _status(db, job_id):
+    job = await db.get(models.PredictionJob, job_id, populate_existing=True)
+    return job.status, job.fen
+
+
+def test_complete_job_with_held_lease():
+    async def scenario(db):
+        job_id = await _running_job(db)
+        assert await jobs.complete_job(db, job_id, 1, "8/8/8/8/8/8/8/8 w - - 0 1")
+        return await _status(db, job_id)
+
+    assert _run(scenario) == ("done", "8/8/8/8/8/8/8/8 w - - 0 1")
+
+
+@pytest.mark.parametrize("attempts, status", [(2, "running"), (1, "failed")])
+def test_complete_job_after_lost_lease_is_ignored(attempts, status):
+    # Re-claimed by another worker (attempts moved on), or reaped as failed
+    async def scenario(db):
+        job_id = await _running_job(db, attempts=attempts, status=status)
+        assert not await jobs.complete_job(db, job_id, 1, "8/8/8/8/8/8/8/8 w - - 0 1")
+        return await _status(db, job_id)
+
+    assert _run(scenario) == (status, None)
+
+
+def test_fail_job_after_lost_lease_is_ignored():
+    async def scenario(db):
+        job_id = await _running_job(db, attempts=2)
+        assert not await jobs.fail_job(db, job_id, 1, 3, "boom")
+        return await _status(db, job_id)
+
+    assert _run(scenario) == ("running", None)
+
+
+def test_fail_job_requeues_with_held_lease():
+    async def scenario(db):
+        job_id = await _running_job(db)
+        assert await jobs.fail_job(db, job_id, 1, 3, "boom")
+        return await _status(db, job_id)
+
+    assert _run(scenario) == ("queued", None)
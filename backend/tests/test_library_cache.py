@@ -0,0 +1,58 @@
+import pytest
+
+FEN = "8/8/8/4k3/8/8/8/4K3 w - - 0 1"
+
+
+def _library(client, **headers):
+    return client.get("/api/fen/library", headers=headers)
+
+
+def _create(client, fen=FEN) -> int:
+    response = client.post("/api/positions/", json={"fen": fen})
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def test_if_none_match_returns_304(client):
+    _create(client)
+    first = _library(client)
+
+    response = _library(client, **{"If-None-Match": first.headers["ETag"]})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == first.headers["ETag"]
+
+
+def test_if_modified_since_returns_304(client):
+    _create(client)
+    first = _library(client)
+
+    response = _library(client, **{"If-Modified-Since": first.headers["Last-Modified"]})
+
+    assert response.status_code == 304
+
+
+def test_if_modified_since_in_the_past_returns_200(client):
+    _create(client)
+
+    response = _library(client, **{"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+
+@pytest.mark.parametrize("change", ["create", "patch", "delete"])
+def test_changes_bump_etag(client, change):
+    position_id = _create(client)
+    before = _library(client).headers["ETag"]
+
+    if change == "create":
+        _create(client, "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1")
+    elif change == "patch":
+        assert client.patch(f"/api/positions/{position_id}", json={"category": "Endgames"}).status_code == 200
+    else:
+        assert client.delete(f"/api/positions/{position_id}").status_code == 204
+
+    response = _library(client, **{"If-None-Match": before})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != before
@@ -0,0 +1,78 @@
+from contextlib import asynccontextmanager
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+import models
+import rate_limit
+from config import settings
+from database import Base, engine
+from ml.scheduler import FairScheduler
+from rate_limit import MemoryBackend, RateLimiter
+from routers import predict
+
+FEN = "8/8/8/4k3/8/8/8/4K3 w - - 0 1"
+
+
+class FakeModel:
+    def predict(self, image):
+        return FEN
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(rate_limit, "predict_limiter", RateLimiter(MemoryBackend(), per_minute=60, burst=100))
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        app.state.inference_scheduler = FairScheduler()
+        yield
+        await app.state.inference_scheduler.stop()
+        await engine.dispose()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(predict.router, prefix="/api/ai")
+    app.state.piece_classifier = FakeModel()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _jobs(client):
+    async def run():
+        async with engine.connect() as conn:
+            return (await conn.execute(select(models.PredictionJob))).all()
+    return client.portal.call(run)
+
+
+def test_predict_returns_fen(client):
+    response = client.post("/api/ai/predict", files={"file": ("board.png", b"\0" * 512, "image/png")})
+
+    assert response.status_code == 200
+    assert response.json()["fen"] == FEN
+
+
+def test_predict_rejects_oversized_image(client):
+    response = client.post("/api/ai/predict", files={"file": ("board.png", b"\0" * 4096, "image/png")})
+
+    assert response.status_code == 413
+
+
+def test_job_rejects_oversized_image(client):
+    response = client.post("/api/ai/predict/jobs", files={"file": ("board.png", b"\0" * 4096, "image/png")})
+
+    assert response.status_code == 413
+    assert _jobs(client) == []
+
+
+def test_job_is_queued(client):
+    response = client.post("/api/ai/predict/jobs", files={"file": ("board.png", b"\0" * 512, "image/png")})
+
+    assert response.status_code == 202
+    assert response.json()["status"] == "queued"
+    assert len(_jobs(client)) == 1
@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+
+import rate_limit
+from rate_limit import MemoryBackend, RateLimitBackend, RateLimitConfigError, RateLimiter, make_backend
+
+
+class FakeClock:
+    """Stands in for the `time` module so bucket refills are deterministic."""
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limit, "time", fake)
+    return fake
+
+
+def _hits(limiter, key, count):
+    async def run():
+        return [await limiter.hit(key) for _ in range(count)]
+    return asyncio.run(run())
+
+
+def test_burst_then_denied(clock):
+    limiter = RateLimiter(MemoryBackend(), per_minute=60, burst=3)
+
+    results = _hits(limiter, "a", 4)
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results] == [2, 1, 0, 0]
+    assert results[-1].retry_after == 1
+
+
+def test_refill_over_time(clock):
+    limiter = RateLimiter(MemoryBackend(), per_minute=30, burst=2)
+    _hits(limiter, "a", 2)
+
+    clock.now += 1
+    assert not _hits(limiter, "a", 1)[0].allowed
+
+    clock.now += 1  # 30/min is one token every 2 seconds
+    assert _hits(limiter, "a", 1)[0].allowed
+
+
+def test_keys_have_separate_buckets(clock):
+    limiter = RateLimiter(MemoryBackend(), per_minute=60, burst=1)
+
+    assert _hits(limiter, "a", 1)[0].allowed
+    assert _hits(limiter, "b", 1)[0].allowed
+    assert not _hits(limiter, "a", 1)[0].allowed
+
+
+def test_headers(clock):
+    limiter = RateLimiter(MemoryBackend(), per_minute=6, burst=2)
+    allowed, denied = _hits(limiter, "a", 3)[1:]
+
+    assert allowed.headers() == {
+        "RateLimit-Limit": "2",
+        "RateLimit-Remaining": "0",
+        "RateLimit-Reset": "20",
+        "X-RateLimit-Limit": "2",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": "1020",
+    }
+    assert denied.headers()["Retry-After"] == "10"
+    assert "Retry-After" not in allowed.headers()
+
+
+def test_sweep_drops_refilled_buckets(clock):
+    backend = MemoryBackend()
+    backend.SWEEP_EVERY = 3
+    limiter = RateLimiter(backend, per_minute=60, burst=1)
+
+    _hits(limiter, "old", 1)
+    clock.now += 5  # "old" is full again after 1 second
+    _hits(limiter, "new", 2)
+
+    assert set(backend._buckets) == {"new"}
+
+
+def test_make_backend():
+    assert isinstance(make_backend(" Memory "), MemoryBackend)
+    with pytest.raises(RateLimitConfigError):
+        make_backend("redis")
+    with pytest.raises(TypeError):
+        RateLimitBackend()
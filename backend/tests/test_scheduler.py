@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+import pytest
+
+from ml.scheduler import FairScheduler, QueueFullError
+
+
+def test_round_robin_between_keys():
+    order = []
+    gate = threading.Event()
+
+    def work(label):
+        gate.wait()
+        order.append(label)
+        return label
+
+    async def run():
+        scheduler = FairScheduler(workers=1, max_queued_per_key=10)
+        # The first request occupies the worker while the rest queue up behind it
+        first = asyncio.create_task(scheduler.submit("a", work, "a0"))
+        await asyncio.sleep(0.05)
+        rest = [asyncio.create_task(scheduler.submit("a", work, f"a{i}")) for i in (1, 2, 3)]
+        rest.append(asyncio.create_task(scheduler.submit("b", work, "b1")))
+        rest.append(asyncio.create_task(scheduler.submit("c", work, "c1")))
+        await asyncio.sleep(0.05)
+        gate.set()
+        results = await asyncio.gather(first, *rest)
+        await scheduler.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert results == ["a0", "a1", "a2", "a3", "b1", "c1"]
+    # The flooding client doesn't make b and c wait behind its whole backlog
+    assert order == ["a0", "a1", "b1", "c1", "a2", "a3"]
+
+
+def test_queue_full_per_key():
+    gate = threading.Event()
+
+    async def run():
+        scheduler = FairScheduler(workers=1, max_queued_per_key=2)
+        running = asyncio.create_task(scheduler.submit("a", gate.wait))
+        await asyncio.sleep(0.05)
+        queued = [asyncio.create_task(scheduler.submit("a", gate.wait)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFullError):
+            await scheduler.submit("a", gate.wait)
+        # Other clients still get in
+        other = asyncio.create_task(scheduler.submit("b", gate.wait))
+        await asyncio.sleep(0)
+
+        gate.set()
+        await asyncio.gather(running, other, *queued)
+        await scheduler.stop()
+
+    asyncio.run(run())
+
+
+def test_errors_reach_the_caller():
+    def boom():
+        raise ValueError("bad image")
+
+    async def run():
+        scheduler = FairScheduler()
+        try:
+            with pytest.raises(ValueError, match="bad image"):
+                await scheduler.submit("a", boom)
+        finally:
+            await scheduler.stop()
+
+    asyncio.run(run())
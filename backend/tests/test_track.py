@@ -0,0 +1,180 @@
+import os
+import tempfile
+from contextlib import asynccontextmanager
+
+import cv2
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import rate_limit
+from ml.scheduler import FairScheduler
+from rate_limit import MemoryBackend, RateLimiter
+from routers import track
+
+
+class FakeClassifier:
+    """Classifies every square as empty; enough to drive the tracker without TFLite."""
+    BOARD_SIZE = 400
+    SQUARE_SIZE = 50
+
+    def classify_squares(self, squares):
+        return np.zeros(len(squares), dtype=np.int64)
+
+
+class RecordingScheduler(FairScheduler):
+    """FairScheduler that remembers which client key each batch was queued under."""
+    def __init__(self):
+        super().__init__()
+        self.keys = []
+
+    async def submit(self, key, fn, *args):
+        self.keys.append(key)
+        return await super().submit(key, fn, *args)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # A fresh limiter per test so earlier tests don't use up this one's budget
+    monkeypatch.setattr(rate_limit, "predict_limiter", RateLimiter(MemoryBackend(), per_minute=60, burst=100))
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.inference_scheduler = RecordingScheduler()
+        yield
+        await app.state.inference_scheduler.stop()
+
+    app = FastAPI(lifespan=lifespan)
+    app.include_router(track.router, prefix="/api/ai")
+    app.state.piece_classifier = FakeClassifier()
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def _png_frame(width=200, height=100) -> bytes:
+    ok, encoded = cv2.imencode(".png", np.zeros((height, width, 3), dtype=np.uint8))
+    assert ok
+    return encoded.tobytes()
+
+
+@pytest.fixture
+def video_path():
+    fd, path = tempfile.mkstemp(suffix=".avi")
+    os.close(fd)
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (200, 100))
+    for _ in range(3):
+        writer.write(np.zeros((100, 200, 3), dtype=np.uint8))
+    writer.release()
+    yield path
+    os.remove(path)
+
+
+@pytest.mark.parametrize("config", [
+    '{"box": [-1, 0, 50, 50]}',
+    '{"box": [0, 0, 0, 50]}',
+    '{"box": [0, 0, 50]}',
+    '{"box": "abc"}',
+    '{"threshold": "high"}',
+    '{"threshold": -3}',
+    '[1, 2, 3]',
+    'not json',
+])
+def test_ws_rejects_invalid_config(client, config):
+    with client.websocket_connect("/api/ai/track/ws") as ws:
+        ws.send_text(config)
+        assert ws.receive_json()["type"] == "error"
+
+
+def test_ws_box_outside_frame_reports_error_and_keeps_stream(client):
+    with client.websocket_connect("/api/ai/track/ws") as ws:
+        ws.send_text('{"box": [150, 0, 100, 100]}')
+        assert ws.receive_json()["type"] == "configured"
+
+        ws.send_bytes(_png_frame())
+        error = ws.receive_json()
+        assert error["type"] == "error"
+        assert "outside" in error["detail"]
+
+        # The connection survives; a box that fits works on the next frames
+        ws.send_text('{"box": [0, 0, 100, 100], "threshold": 5}')
+        assert ws.receive_json()["type"] == "configured"
+        ws.send_bytes(_png_frame())
+        ws.send_bytes(_png_frame())
+        assert ws.receive_json()["type"] == "position"
+
+
+def test_video_box_outside_frame_returns_400(client, video_path):
+    with open(video_path, "rb") as f:
+        response = client.post(
+            "/api/ai/track/video",
+            params={"box": "150,0,100,100"},
+            files={"file": ("game.avi", f, "video/x-msvideo")}
+        )
+
+    assert response.status_code == 400
+    assert "outside" in response.json()["detail"]
+
+
+def test_video_invalid_box_returns_400(client, video_path):
+    with open(video_path, "rb") as f:
+        response = client.post(
+            "/api/ai/track/video",
+            params={"box": "0,0,-5,10"},
+            files={"file": ("game.avi", f, "video/x-msvideo")}
+        )
+
+    assert response.status_code == 400
+
+
+def test_video_tracks_positions(client, video_path):
+    with open(video_path, "rb") as f:
+        response = client.post("/api/ai/track/video", files={"file": ("game.avi", f, "video/x-msvideo")})
+
+    assert response.status_code == 200
+    events = response.json()["events"]
+    assert [e["type"] for e in events] == ["position"]
+
+
+def test_video_inference_goes_through_scheduler(client, video_path):
+    with open(video_path, "rb") as f:
+        response = client.post("/api/ai/track/video", files={"file": ("game.avi", f, "video/x-msvideo")})
+
+    assert response.status_code == 200
+    keys = client.app.state.inference_scheduler.keys
+    assert keys and set(keys) == {"ip:testclient"}
+
+
+def test_ws_inference_goes_through_scheduler(client):
+    with client.websocket_connect("/api/ai/track/ws") as ws:
+        ws.send_bytes(_png_frame(100, 100))
+        ws.send_bytes(_png_frame(100, 100))
+        assert ws.receive_json()["type"] == "position"
+
+    assert set(client.app.state.inference_scheduler.keys) == {"ip:testclient"}
+
+
+def test_video_is_rate_limited(client, monkeypatch, video_path):
+    monkeypatch.setattr(rate_limit, "predict_limiter", RateLimiter(MemoryBackend(), per_minute=1, burst=1))
+    for expected in (200, 429):
+        with open(video_path, "rb") as f:
+            response = client.post("/api/ai/track/video", files={"file": ("game.avi", f, "video/x-msvideo")})
+        assert response.status_code == expected
+    assert "Retry-After" in response.headers
+
+
+def test_ws_open_is_rate_limited(client, monkeypatch):
+    monkeypatch.setattr(rate_limit, "predict_limiter", RateLimiter(MemoryBackend(), per_minute=1, burst=1))
+    with client.websocket_connect("/api/ai/track/ws") as ws:
+        ws.send_text('{"threshold": 5}')
+        assert ws.receive_json()["type"] == "configured"
+
+    with client.websocket_connect("/api/ai/track/ws") as ws:
+        error = ws.receive_json()
+        assert error["type"] == "error"
+        assert error["retry_after"] > 0
+
+
+def test_ws_rejects_invalid_token(client):
+    with client.websocket_connect("/api/ai/track/ws?token=garbage") as ws:
+        assert ws.receive_json()["type"] == "error"
@@ -0,0 +1,41 @@
+import io
+
+from PIL import Image
+from sqlalchemy import select
+
+import models
+from config import settings
+
+FEN = "8/8/8/4k3/8/8/8/4K3 w - - 0 1"
+
+
+def _png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), (181, 136, 99)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_upload_saves_position(client, db_rows):
+    response = client.post(
+        "/api/fen/upload",
+        data={"fen": FEN},
+        files={"file": ("board.png", _png_bytes(), "image/png")}
+    )
+
+    assert response.status_code == 200
+    rows = db_rows(select(models.Position).where(models.Position.id == response.json()["id"]))
+    assert len(rows) == 1
+
+
+def test_upload_rejects_oversized_image(client, s3, db_rows, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1024)
+
+    response = client.post(
+        "/api/fen/upload",
+        data={"fen": FEN},
+        files={"file": ("board.png", b"\0" * 4096, "image/png")}
+    )
+
+    assert response.status_code == 413
+    assert s3.list_objects_v2(Bucket=settings.AWS_BUCKET_NAME).get("KeyCount", 0) == 0
+    assert db_rows(select(models.Position)) == []
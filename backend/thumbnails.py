@@ -0,0 +1,49 @@
+import io
+from typing import Dict, Optional, Tuple
+from PIL import Image
+
+from config import settings
+from storage import upload_bytes, variant_key
+
+# Same normalization ChessPredictor applies before slicing the board into squares
+BOARD_SIZE = 400
+
+CONTENT_TYPES = {"WEBP": "image/webp", "JPEG": "image/jpeg"}
+
+
+def _encode(img: Image.Image, fmt: str) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format=fmt, quality=settings.THUMBNAIL_QUALITY)
+    return buffer.getvalue()
+
+
+def make_variants(data: bytes) -> Dict[str, Tuple[bytes, str, str]]:
+    """
+    Builds the compact variants for an uploaded board image.
+    Returns {"thumb": (bytes, extension, content_type), "board": (...)}.
+    """
+    fmt = settings.THUMBNAIL_FORMAT.upper()
+    extension = "jpg" if fmt == "JPEG" else fmt.lower()
+
+    with Image.open(io.BytesIO(data)) as img:
+        img = img.convert('RGB')
+
+        # Library grid thumbnail, aspect ratio preserved
+        thumb = img.copy()
+        thumb.thumbnail((settings.THUMBNAIL_SIZE, settings.THUMBNAIL_SIZE))
+
+        # The normalized 400x400 board the classifier sees
+        board = img.resize((BOARD_SIZE, BOARD_SIZE))
+
+    return {
+        "thumb": (_encode(thumb, fmt), extension, CONTENT_TYPES[fmt]),
+        "board": (_encode(board, fmt), extension, CONTENT_TYPES[fmt]),
+    }
+
+
+def store_variants(key: str, data: bytes) -> Dict[str, Optional[str]]:
+    """Generates the variants for an original stored at `key` and uploads them next to it."""
+    urls = {}
+    for name, (payload, extension, content_type) in make_variants(data).items():
+        urls[name] = upload_bytes(variant_key(key, name, extension), payload, content_type)
+    return {"thumbnail_path": urls["thumb"], "board_image_path": urls["board"]}
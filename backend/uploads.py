@@ -0,0 +1,21 @@
+from typing import Optional
+
+from fastapi import HTTPException, UploadFile
+
+from config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+
+async def read_upload(file: UploadFile, max_bytes: Optional[int] = None) -> bytes:
+    """
+    Reads an uploaded file in chunks and raises 413 as soon as it passes
+    max_bytes (MAX_UPLOAD_BYTES by default), before it's fully buffered.
+    """
+    limit = settings.MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    data = bytearray()
+    while chunk := await file.read(CHUNK_SIZE):
+        data += chunk
+        if len(data) > limit:
+            raise HTTPException(status_code=413, detail="File is too large.")
+    return bytes(data)
@@ -0,0 +1,57 @@
+import asyncio
+import io
+import os
+import time
+
+import jobs
+from config import settings
+from database import AsyncSessionLocal
+from ml.predictor import ChessPredictor
+
+MODEL_PATH = "ml/piece_classifier_model.tflite"
+
+
+async def run_worker():
+    """
+    Inference worker: claims prediction jobs from Postgres and runs the model.
+    Run as many of these as needed, independently of the API servers:
+        python worker.py
+    """
+    if not os.path.exists(MODEL_PATH):
+        raise SystemExit(f"⚠️ Model not found at {MODEL_PATH}. Worker cannot start.")
+
+    print(f"🧠 Loading ChessLens AI Model from {MODEL_PATH}...")
+    predictor = ChessPredictor(MODEL_PATH)
+    print("✅ Worker ready, waiting for jobs.")
+
+    last_reap = 0.0
+    while True:
+        async with AsyncSessionLocal() as db:
+            # Sweep dead leases on a timer, busy or idle, so they never pin an owner's active-job count
+            if time.monotonic() - last_reap >= settings.JOB_REAP_INTERVAL_SECONDS:
+                await jobs.reap_expired_jobs(db)
+                last_reap = time.monotonic()
+
+            job = await jobs.claim_job(db)
+
+            if job is None:
+                await asyncio.sleep(settings.JOB_WORKER_POLL_SECONDS)
+                continue
+
+            # Copy what we need up front: a rollback expires the ORM instance
+            job_id, attempts, max_attempts = job.id, job.attempts, job.max_attempts
+            try:
+                # Inference is CPU-bound; keep the event loop free for DB I/O
+                fen = await asyncio.to_thread(predictor.predict, io.BytesIO(job.image))
+                if await jobs.complete_job(db, job_id, attempts, fen):
+                    print(f"✅ Job {job_id} done: {fen}")
+                else:
+                    print(f"⚠️ Job {job_id} lease expired before it finished; result discarded")
+            except Exception as e:
+                print(f"⚠️ Job {job_id} failed (attempt {attempts}/{max_attempts}): {e}")
+                await db.rollback()
+                await jobs.fail_job(db, job_id, attempts, max_attempts, str(e))
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker())
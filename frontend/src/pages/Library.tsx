@@ -6,6 +6,7 @@ interface SavedBoard {
   id: string | number;
   fen: string;
   image_path: string;
+  thumbnail_path?: string | null;
   category?: string; // Made optional just in case
   created_at: string;
 }
@@ -127,7 +128,7 @@ export default function Library() {
                 className="block relative aspect-square bg-gray-900 overflow-hidden cursor-pointer"
               >
                 <img
-                  src={board.image_path}
+                  src={board.thumbnail_path || board.image_path}
                   alt="Chessboard"
                   className="w-full h-full object-cover group-hover:scale-105 transition-transform duration-500"
                 />